@@ -1,5 +1,6 @@
 import os
-from flask import Flask, render_template
+from datetime import datetime, timedelta
+from flask import Flask, Request, render_template, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_cors import CORS
@@ -12,8 +13,19 @@ db = SQLAlchemy()
 login_manager = LoginManager()
 
 
+class AppRequest(Request):
+    """Request with a larger body limit for the multi-page OCR upload"""
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'ocr.batch_ocr':
+            return current_app.config['OCR_BATCH_MAX_CONTENT_LENGTH']
+        return super().max_content_length
+
+
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.request_class = AppRequest
     app.config.from_object(config_class)
 
     # Ensure TTS output folder exists
@@ -25,10 +37,34 @@ def create_app(config_class=Config):
     login_manager.init_app(app)
     CORS(app)
 
-    # Initialize OCR reader (singleton)
-    from app.services.ocr_service import init_ocr_reader
+    # Initialize OCR reader (singleton), or use the shared model server
+    from app.services.ocr_service import init_ocr_reader, use_model_server
     with app.app_context():
-        init_ocr_reader(app.config['OCR_LANGUAGES'])
+        if app.config['MODEL_SERVER_ADDRESS']:
+            use_model_server(
+                app.config['MODEL_SERVER_ADDRESS'],
+                app.config['MODEL_SERVER_AUTHKEY'].encode(),
+                timeout=app.config['MODEL_SERVER_CONNECT_TIMEOUT']
+            )
+        else:
+            init_ocr_reader(
+                app.config['OCR_LANGUAGES'],
+                vietocr_batch_size=app.config['OCR_VIETOCR_BATCH_SIZE'],
+                vietocr_bucket_width=app.config['OCR_VIETOCR_BUCKET_WIDTH'],
+                default_profile=app.config['OCR_DEFAULT_PROFILE'],
+                vietocr_batch_window_ms=app.config['OCR_VIETOCR_BATCH_WINDOW_MS'],
+                vietocr_scheduler_batch_size=app.config['OCR_VIETOCR_SCHEDULER_BATCH_SIZE'],
+                quantize=app.config['OCR_CPU_QUANTIZE'],
+                torch_threads=app.config['OCR_TORCH_THREADS'],
+                torchscript_dir=app.config['OCR_TORCHSCRIPT_DIR'],
+                recognition_cache_size=app.config['OCR_RECOGNITION_CACHE_SIZE'],
+                recognition_cache_path=app.config['OCR_RECOGNITION_CACHE_PATH']
+            )
+
+    # BART is loaded on first use unless warmed up here (never with a model server)
+    if app.config['BART_WARMUP'] and not app.config['MODEL_SERVER_ADDRESS']:
+        from app.services.model_inference import warm_up_bart
+        warm_up_bart(background=True)
 
     # Register blueprints
     from app.routes.auth import auth_bp
@@ -47,6 +83,12 @@ def create_app(config_class=Config):
     with app.app_context():
         db.create_all()
 
+        if app.config['OCR_JOB_FAIL_INTERRUPTED']:
+            from app.services.ocr_job_service import OCRJobService
+            OCRJobService.fail_interrupted(
+                datetime.utcnow() - timedelta(seconds=app.config['OCR_JOB_STALE_SECONDS'])
+            )
+
     # Home route
     @app.route('/')
     def index():
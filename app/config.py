@@ -29,7 +29,60 @@ class Config:
     
     # OCR
     OCR_LANGUAGES = os.getenv('OCR_LANGUAGES', 'en,vi').split(',')
+    OCR_DEFAULT_PROFILE = os.getenv('OCR_DEFAULT_PROFILE', 'balanced')  # fast, balanced, accurate
+    OCR_VIETOCR_BATCH_SIZE = int(os.getenv('OCR_VIETOCR_BATCH_SIZE', 32))
+    OCR_VIETOCR_BUCKET_WIDTH = int(os.getenv('OCR_VIETOCR_BUCKET_WIDTH', 32))  # px
+    # Cross-request micro-batching: wait up to N ms for crops of other requests (0 = off)
+    OCR_VIETOCR_BATCH_WINDOW_MS = float(os.getenv('OCR_VIETOCR_BATCH_WINDOW_MS', 5))
+    OCR_VIETOCR_SCHEDULER_BATCH_SIZE = int(os.getenv('OCR_VIETOCR_SCHEDULER_BATCH_SIZE', 64))
+    # CPU nodes: int8 dynamic quantization of VietOCR, intra-op threads (0 = default)
+    OCR_CPU_QUANTIZE = os.getenv('OCR_CPU_QUANTIZE', 'false').lower() == 'true'
+    OCR_TORCH_THREADS = int(os.getenv('OCR_TORCH_THREADS', 0))
+    # Crop-hash memoization of VietOCR: in-memory LRU entries (0 = off) + sqlite file
+    OCR_RECOGNITION_CACHE_SIZE = int(os.getenv('OCR_RECOGNITION_CACHE_SIZE', 10000))
+    OCR_RECOGNITION_CACHE_PATH = os.getenv(
+        'OCR_RECOGNITION_CACHE_PATH',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'ocr_recognition.sqlite3')
+    )
+    # Re-uploads that are near-duplicates (dHash within N of 256 bits) of an earlier upload:
+    # auto = reuse its result, offer = ask the client first (409 NEAR_DUPLICATE), off
+    OCR_NEAR_DUPLICATE_MODE = os.getenv('OCR_NEAR_DUPLICATE_MODE', 'offer')
+    OCR_NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv('OCR_NEAR_DUPLICATE_MAX_DISTANCE', 12))
+    # POST /api/ocr/single/stream: lines recognized per `segments` event
+    OCR_STREAM_CHUNK_LINES = int(os.getenv('OCR_STREAM_CHUNK_LINES', 8))
+    # Region re-OCR (POST /api/ocr/images/<id>/regions): rectangles per request
+    OCR_MAX_REGIONS = int(os.getenv('OCR_MAX_REGIONS', 50))
+    # Traced models built by `python -m app.services.ocr_export`, loaded when present (empty = never)
+    OCR_TORCHSCRIPT_DIR = os.getenv(
+        'OCR_TORCHSCRIPT_DIR',
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'ocr_torchscript')
+    )
+
+    # OCR job queue
+    OCR_JOB_WORKERS = int(os.getenv('OCR_JOB_WORKERS', 2))
+    OCR_JOB_QUEUE_SIZE = int(os.getenv('OCR_JOB_QUEUE_SIZE', 32))
+    OCR_JOB_MAX_WAIT = int(os.getenv('OCR_JOB_MAX_WAIT', 30))  # seconds (long-poll)
+    # Fail pending / processing rows whose process is gone (the job queue is in memory):
+    # live processes refresh updated_at of their rows every HEARTBEAT seconds,
+    # rows not refreshed for STALE seconds are failed at boot and by the heartbeat
+    OCR_JOB_FAIL_INTERRUPTED = os.getenv('OCR_JOB_FAIL_INTERRUPTED', 'true').lower() == 'true'
+    OCR_JOB_HEARTBEAT_SECONDS = int(os.getenv('OCR_JOB_HEARTBEAT_SECONDS', 30))
+    OCR_JOB_STALE_SECONDS = int(os.getenv('OCR_JOB_STALE_SECONDS', 120))
+
+    # OCR batch (multi-page upload)
+    OCR_BATCH_WORKERS = int(os.getenv('OCR_BATCH_WORKERS', 2))  # processes, each loads the models
+    OCR_BATCH_MAX_FILES = int(os.getenv('OCR_BATCH_MAX_FILES', 200))
+    OCR_BATCH_MAX_CONTENT_LENGTH = int(os.getenv('OCR_BATCH_MAX_CONTENT_LENGTH', 200 * 1024 * 1024))  # 200MB
+
+    # Model server (python -m app.services.model_server): when set, web workers
+    # send OCR / BART calls to it instead of loading the models themselves
+    MODEL_SERVER_ADDRESS = os.getenv('MODEL_SERVER_ADDRESS', '')  # Unix socket path or host:port
+    MODEL_SERVER_AUTHKEY = os.getenv('MODEL_SERVER_AUTHKEY', 'dev-model-server-key')
+    MODEL_SERVER_CONNECT_TIMEOUT = int(os.getenv('MODEL_SERVER_CONNECT_TIMEOUT', 30))  # seconds
     
+    # BART correction is loaded on first use; true = load + warm up in the background at startup
+    BART_WARMUP = os.getenv('BART_WARMUP', 'false').lower() == 'true'
+
     # Text Processing
     MAX_TEXT_LENGTH = int(os.getenv('MAX_TEXT_LENGTH', 2000))
     
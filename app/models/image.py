@@ -16,6 +16,7 @@ class Image(db.Model):
     height = db.Column(db.Integer, nullable=True)
     source = db.Column(db.String(50), default='upload')  # upload, url, camera
     checksum = db.Column(db.String(64), nullable=True, index=True)  # SHA256
+    phash = db.Column(db.String(64), nullable=True)  # 256-bit dHash (hex), near-duplicate lookup
     created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
@@ -33,5 +34,6 @@ class Image(db.Model):
             'height': self.height,
             'source': self.source,
             'checksum': self.checksum,
+            'phash': self.phash,
             'created_at': self.created_at.isoformat()
         }
@@ -13,6 +13,9 @@ class OCRResult(db.Model):
     # OCR Engine info
     engine = db.Column(db.String(30), default='easyocr')
     language = db.Column(db.String(20), default='vi,en')
+    pipeline_fingerprint = db.Column(db.String(64), nullable=True, index=True)  # version + params (reuse key)
+    preprocess_plan = db.Column(db.String(20), nullable=True)  # none, clahe, fast, nlm
+    profile = db.Column(db.String(20), nullable=True)  # fast, balanced, accurate
     
     # Text outputs
     raw_text = db.Column(db.Text, nullable=True)
@@ -42,6 +45,9 @@ class OCRResult(db.Model):
             'user_id': self.user_id,
             'engine': self.engine,
             'language': self.language,
+            'pipeline_fingerprint': self.pipeline_fingerprint,
+            'preprocess_plan': self.preprocess_plan,
+            'profile': self.profile,
             'raw_text': self.raw_text,
             'processed_text': self.processed_text,
             'corrected_text': self.corrected_text,
@@ -73,6 +79,10 @@ class OCRSegment(db.Model):
     bbox_y1 = db.Column(db.Integer, nullable=True)
     bbox_x2 = db.Column(db.Integer, nullable=True)
     bbox_y2 = db.Column(db.Integer, nullable=True)
+
+    # Provenance: recognizer that produced the text and its pass (1-3)
+    engine = db.Column(db.String(20), nullable=True)
+    ocr_pass = db.Column(db.SmallInteger, nullable=True)
     
     position = db.Column(db.Integer, default=0, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -89,6 +99,8 @@ class OCRSegment(db.Model):
                 'x2': self.bbox_x2,
                 'y2': self.bbox_y2
             } if self.bbox_x1 is not None else None,
+            'engine': self.engine,
+            'ocr_pass': self.ocr_pass,
             'position': self.position,
             'created_at': self.created_at.isoformat()
         }
@@ -1,12 +1,22 @@
+import json
+import math
 import os
-import hashlib
 import time
-from flask import Blueprint, request, jsonify, current_app
+import zipfile
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from app import db
-from app.models import Image, OCRResult, OCRSegment, Work, TextBlock
-from app.services.ocr_service import OCRService
+from app.models import Image, OCRResult, Work
+from app.services.ocr_service import (
+    OCRService, OCR_PROFILES, get_vietocr_scheduler_stats, get_recognition_cache_stats
+)
+from app.services.image_context import ImageContext
+from app.services.ocr_result_service import OCRResultService
+from app.services.ocr_job_service import OCRJobService
+from app.services.ocr_batch_service import OCRBatchService
+from app.services.ocr_cache_service import OCRCacheService
+from app.services.near_duplicate_service import NearDuplicateService
 from app.services.model_inference import run_bart_model
 
 ocr_bp = Blueprint('ocr', __name__)
@@ -20,129 +30,141 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_extension
 
 
-@ocr_bp.route('/single', methods=['POST'])
-@login_required
-def single_image_ocr():
+def _begin_single_upload(start_time):
+    """
+    Validate the /single form, save the upload and reuse a stored result
+    when possible. Shared by /single and /single/stream.
+
+    Returns:
+        (error response, None) or (None, upload dict)
+    """
     if 'image' not in request.files:
-        return jsonify({'error': 'No image file provided'}), 400
+        return (jsonify({'error': 'No image file provided'}), 400), None
 
     file = request.files['image']
 
     if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+        return (jsonify({'error': 'No file selected'}), 400), None
 
     if not allowed_file(file.filename):
-        return jsonify({'error': 'Invalid file type. Allowed: jpg, jpeg, png'}), 400
+        return (jsonify({'error': 'Invalid file type. Allowed: jpg, jpeg, png'}), 400), None
+
+    # Read image bytes
+    image_bytes = file.read()
+
+    # Check file size
+    max_size = current_app.config.get('MAX_CONTENT_LENGTH', 5 * 1024 * 1024)
+    if len(image_bytes) > max_size:
+        return (jsonify({'error': f'File too large. Max size: {max_size // (1024*1024)}MB'}), 400), None
+
+    # Validate profile before saving anything
+    profile = request.form.get('profile') or None
+    try:
+        fingerprint = OCRService.pipeline_fingerprint(profile)
+    except ValueError as e:
+        return (jsonify({'error': str(e), 'error_code': 'INVALID_PROFILE'}), 400), None
+
+    # near_duplicate=reuse / ignore answers an offer, default: OCR_NEAR_DUPLICATE_MODE
+    near_duplicate = request.form.get('near_duplicate') or None
+    if near_duplicate not in (None, 'reuse', 'ignore'):
+        return (jsonify({'error': 'near_duplicate must be reuse or ignore'}), 400), None
+
+    # Save image file + Image record
+    filename = secure_filename(file.filename)
+    image = OCRResultService.save_upload(
+        current_user.id,
+        filename,
+        image_bytes,
+        current_app.config.get('UPLOAD_FOLDER', 'uploads'),
+        mime_type=file.content_type
+    )
+
+    ocr_result = OCRResultService.create_pending(image, profile)
+
+    # Same bytes (or a near-duplicate) + same pipeline already processed: reuse the stored result
+    cached = OCRCacheService.reuse(
+        ocr_result, fingerprint,
+        near_duplicate=None if near_duplicate is None else near_duplicate == 'reuse'
+    )
+
+    if cached is None and near_duplicate is None \
+            and current_app.config.get('OCR_NEAR_DUPLICATE_MODE') == 'offer':
+        found = OCRCacheService.find_near_duplicate(image, fingerprint)
+        if found is not None:
+            # let the client choose before spending inference on it
+            source, distance = found
+            offer = {
+                'ocr_result_id': source.id,
+                'image_id': source.image_id,
+                'file_name': source.image.file_name,
+                'distance': distance
+            }
+            db.session.rollback()
+            os.remove(image.file_path)
+            return (jsonify({
+                'error': 'A near-duplicate of this image was already processed',
+                'error_code': 'NEAR_DUPLICATE',
+                'near_duplicate': offer
+            }), 409), None
+
+    if cached is not None:
+        ocr_result.processing_time_ms = int((time.time() - start_time) * 1000)
+
+    return None, {
+        'image': image,
+        'image_bytes': image_bytes,
+        'filename': filename,
+        'profile': profile,
+        'fingerprint': fingerprint,
+        'ocr_result': ocr_result,
+        'cached': cached,
+        'near_duplicate_of': cached.id if cached is not None and cached.image.checksum != image.checksum else None
+    }
 
+
+@ocr_bp.route('/single', methods=['POST'])
+@login_required
+def single_image_ocr():
     try:
         start_time = time.time()
 
-        # Read image bytes
-        image_bytes = file.read()
-
-        # Check file size
-        max_size = current_app.config.get('MAX_CONTENT_LENGTH', 5 * 1024 * 1024)
-        if len(image_bytes) > max_size:
-            return jsonify({'error': f'File too large. Max size: {max_size // (1024*1024)}MB'}), 400
-
-        # Calculate checksum
-        checksum = hashlib.sha256(image_bytes).hexdigest()
-
-        # Save image file
-        filename = secure_filename(file.filename)
-        upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-
-        # Generate unique filename
-        unique_filename = f"{current_user.id}_{int(time.time())}_{filename}"
-        file_path = os.path.join(upload_folder, unique_filename)
-
-        with open(file_path, 'wb') as f:
-            f.write(image_bytes)
-
-        # Save Image record to database
-        image = Image(
-            user_id=current_user.id,
-            file_name=filename,
-            file_path=file_path,
-            file_size=len(image_bytes),
-            mime_type=file.content_type,
-            source='upload',
-            checksum=checksum
-        )
-        db.session.add(image)
-        db.session.flush()  # Get image.id
-
-        # Run OCR
-        segments = OCRService.extract_text(image_bytes)
-        raw_text = OCRService.segments_to_text(segments)
-
-        # Process text
-        # processor = raw_text
-        processed_text = raw_text
-
-        # bart_output = run_bart_model(processed_text)
-
-        # Calculate processing time
-        processing_time_ms = int((time.time() - start_time) * 1000)
-
-        # Calculate average confidence
-        confidence_avg = None
-        if segments:
-            confidences = [seg.get('confidence', 0) for seg in segments if 'confidence' in seg]
-            if confidences:
-                confidence_avg = sum(confidences) / len(confidences)
-
-        # Save OCR Result
-        ocr_result = OCRResult(
-            image_id=image.id,
-            user_id=current_user.id,
-            engine='easyocr',
-            language='vi,en',
-            raw_text=raw_text,
-            processed_text=processed_text,
-            corrected_text=raw_text,
-            confidence_avg=confidence_avg,
-            processing_time_ms=processing_time_ms,
-            word_count=len(processed_text.split()) if processed_text else 0,
-            status='completed'
-        )
-        db.session.add(ocr_result)
-        db.session.flush()  # Get ocr_result.id
-
-        # Save OCR Segments
-        for idx, seg in enumerate(segments):
-            bbox = seg.get('bbox', [])
-            ocr_segment = OCRSegment(
-                ocr_result_id=ocr_result.id,
-                text=seg.get('text', ''),
-                confidence=seg.get('confidence', 0),
-                bbox_x1=int(bbox[0][0]) if len(bbox) > 0 else None,
-                bbox_y1=int(bbox[0][1]) if len(bbox) > 0 else None,
-                bbox_x2=int(bbox[2][0]) if len(bbox) > 2 else None,
-                bbox_y2=int(bbox[2][1]) if len(bbox) > 2 else None,
-                position=idx
+        error, upload = _begin_single_upload(start_time)
+        if error is not None:
+            return error
+
+        image = upload['image']
+        ocr_result = upload['ocr_result']
+        cached = upload['cached']
+
+        if cached is not None:
+            segments = OCRCacheService.segments_of(cached)
+            raw_text = ocr_result.raw_text
+            processed_text = ocr_result.processed_text
+        else:
+            # Run OCR
+            ctx = ImageContext.from_bytes(upload['image_bytes'])
+            segments = OCRService.extract_text(ctx, profile=upload['profile'])
+            raw_text = OCRService.segments_to_text(segments)
+
+            # Process text
+            # processor = raw_text
+            processed_text = raw_text
+
+            # bart_output = run_bart_model(processed_text)
+
+            # Calculate processing time
+            processing_time_ms = int((time.time() - start_time) * 1000)
+
+            # Save OCR Result + segments
+            OCRResultService.complete(
+                ocr_result, segments, raw_text, processed_text, processing_time_ms,
+                pipeline_fingerprint=upload['fingerprint'],
+                preprocess_plan=ctx.preprocess_plan,
+                profile=ctx.profile
             )
-            db.session.add(ocr_segment)
 
         # Create Work with text block
-        work = Work(
-            user_id=current_user.id,
-            title=filename,
-            ocr_result_id=ocr_result.id
-        )
-        db.session.add(work)
-        db.session.flush()  # Get work.id
-
-        # Create initial text block with OCR result
-        text_block = TextBlock(
-            work_id=work.id,
-            source_type='ocr',
-            title='OCR Result',
-            content=processed_text or raw_text,
-            position=0
-        )
-        db.session.add(text_block)
+        work = OCRResultService.create_work(ocr_result, upload['filename'], processed_text or raw_text)
 
         db.session.commit()
 
@@ -154,7 +176,279 @@ def single_image_ocr():
             'segments': segments,
             'image_id': image.id,
             'ocr_result_id': ocr_result.id,
-            'work_id': work.id
+            'work_id': work.id,
+            'preprocess_plan': ocr_result.preprocess_plan,
+            'profile': ocr_result.profile,
+            'from_cache': cached is not None,
+            'near_duplicate_of': upload['near_duplicate_of']
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+
+def _sse(event, data):
+    """One Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@ocr_bp.route('/single/stream', methods=['POST'])
+@login_required
+def single_image_ocr_stream():
+    """
+    /single as a Server-Sent Events stream: `boxes` once detection is done,
+    `segments` as recognition chunks finish, then `done` with the stored ids
+    (or `error`). Same form fields as /single.
+    """
+    start_time = time.time()
+
+    try:
+        error, upload = _begin_single_upload(start_time)
+        if error is not None:
+            return error
+
+        cached = upload['cached']
+        cached_segments = OCRCacheService.segments_of(cached) if cached is not None else None
+        image_id = upload['image'].id
+        ocr_result_id = upload['ocr_result'].id
+        if cached is None:
+            upload['ocr_result'].status = 'processing'
+
+        # the stream runs in a new app context, i.e. with another DB session:
+        # the upload must be committed before it starts
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+    chunk_size = current_app.config.get('OCR_STREAM_CHUNK_LINES', 8)
+
+    def fail(message):
+        db.session.rollback()
+        ocr_result = db.session.get(OCRResult, ocr_result_id)
+        ocr_result.status = 'failed'
+        ocr_result.error_message = message
+        db.session.commit()
+
+    app = current_app._get_current_object()
+
+    def generate():
+        ocr_result = db.session.get(OCRResult, ocr_result_id)
+        finished = False
+        OCRJobService.track(app, [ocr_result_id])
+
+        try:
+            if cached_segments is not None:
+                yield _sse('boxes', {'boxes': [segment['bbox'] for segment in cached_segments]})
+                yield _sse('segments', {'segments': [
+                    dict(segment, index=index) for index, segment in enumerate(cached_segments)
+                ]})
+                raw_text = ocr_result.raw_text
+                processed_text = ocr_result.processed_text
+            else:
+                ctx = ImageContext.from_bytes(upload['image_bytes'])
+                segments = []
+
+                for kind, payload in OCRService.extract_text_stream(
+                        ctx, profile=upload['profile'], chunk_size=chunk_size):
+                    if kind == 'boxes':
+                        yield _sse('boxes', {'boxes': payload})
+                    else:
+                        segments.extend(segment for _, segment in payload)
+                        yield _sse('segments', {'segments': [
+                            dict(segment, index=index) for index, segment in payload
+                        ]})
+
+                raw_text = OCRService.segments_to_text(segments)
+                processed_text = raw_text
+
+                OCRResultService.complete(
+                    ocr_result, segments, raw_text, processed_text,
+                    int((time.time() - start_time) * 1000),
+                    pipeline_fingerprint=upload['fingerprint'],
+                    preprocess_plan=ctx.preprocess_plan,
+                    profile=ctx.profile
+                )
+
+            work = OCRResultService.create_work(ocr_result, upload['filename'], processed_text or raw_text)
+            db.session.commit()
+            finished = True
+
+            yield _sse('done', {
+                'success': True,
+                'raw_text': raw_text,
+                'processed_text': processed_text,
+                'image_id': image_id,
+                'ocr_result_id': ocr_result_id,
+                'work_id': work.id,
+                'preprocess_plan': ocr_result.preprocess_plan,
+                'profile': ocr_result.profile,
+                'from_cache': cached_segments is not None,
+                'near_duplicate_of': upload['near_duplicate_of'],
+                'processing_time_ms': ocr_result.processing_time_ms
+            })
+
+        except Exception as e:
+            fail(str(e))
+            finished = True
+            yield _sse('error', {'error': str(e), 'ocr_result_id': ocr_result_id})
+
+        finally:
+            # client disconnected mid-stream (GeneratorExit): don't leave the row pending
+            OCRJobService.untrack([ocr_result_id])
+            if not finished:
+                fail('Client disconnected before the OCR finished')
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@ocr_bp.route('/jobs', methods=['POST'])
+@login_required
+def submit_ocr_job():
+    """
+    Queue an image for OCR and return immediately.
+    Poll GET /jobs/<job_id> for the result.
+    """
+    if 'image' not in request.files:
+        return jsonify({'error': 'No image file provided'}), 400
+
+    file = request.files['image']
+
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+
+    if not allowed_file(file.filename):
+        return jsonify({'error': 'Invalid file type. Allowed: jpg, jpeg, png'}), 400
+
+    image_bytes = file.read()
+
+    max_size = current_app.config.get('MAX_CONTENT_LENGTH', 5 * 1024 * 1024)
+    if len(image_bytes) > max_size:
+        return jsonify({'error': f'File too large. Max size: {max_size // (1024*1024)}MB'}), 400
+
+    profile = request.form.get('profile') or None
+    try:
+        OCRService.resolve_settings(profile)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'error_code': 'INVALID_PROFILE'}), 400
+
+    app = current_app._get_current_object()
+    if not OCRJobService.reserve_slot(app):
+        return jsonify({'error': 'OCR queue is full, try again later', 'error_code': 'QUEUE_FULL'}), 503
+
+    try:
+        image = OCRResultService.save_upload(
+            current_user.id,
+            secure_filename(file.filename),
+            image_bytes,
+            current_app.config.get('UPLOAD_FOLDER', 'uploads'),
+            mime_type=file.content_type
+        )
+        ocr_result = OCRResultService.create_pending(image, profile)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        OCRJobService.release_slot()
+        return jsonify({'error': str(e)}), 500
+
+    OCRJobService.submit(app, ocr_result.id)
+
+    return jsonify({
+        'success': True,
+        'job_id': ocr_result.id,
+        'status': ocr_result.status,
+        'image_id': image.id
+    }), 202
+
+
+@ocr_bp.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_ocr_job(job_id):
+    """
+    Job status. ?wait=<seconds> long-polls until the job finishes
+    (capped by OCR_JOB_MAX_WAIT).
+    """
+    ocr_result = OCRResult.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if not ocr_result:
+        return jsonify({'error': 'Job not found'}), 404
+
+    wait = request.args.get('wait', 0, type=float)
+    if wait > 0:
+        wait = min(wait, current_app.config.get('OCR_JOB_MAX_WAIT', 30))
+        ocr_result = OCRJobService.wait(job_id, wait)
+        if ocr_result is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+    completed = ocr_result.status == 'completed'
+
+    return jsonify({
+        'job_id': ocr_result.id,
+        'status': ocr_result.status,
+        'result': ocr_result.to_dict(include_segments=True) if completed else None,
+        'work_id': OCRResultService.find_work_id(ocr_result) if completed else None,
+        'error': ocr_result.error_message
+    })
+
+
+@ocr_bp.route('/images/<int:image_id>/regions', methods=['POST'])
+@login_required
+def reocr_regions(image_id):
+    """
+    Re-OCR rectangles of an already processed image and update its segments.
+    JSON body: {"regions": [[x1, y1, x2, y2], ...], "ocr_result_id": optional,
+    "profile": optional}, coordinates in original image pixels.
+    """
+    image = Image.query.filter_by(id=image_id, user_id=current_user.id).first()
+    if not image:
+        return jsonify({'error': 'Image not found'}), 404
+
+    data = request.get_json(silent=True) or {}
+    regions = data.get('regions')
+    max_regions = current_app.config.get('OCR_MAX_REGIONS', 50)
+    if not isinstance(regions, list) or not regions:
+        return jsonify({'error': 'regions must be a non-empty list of [x1, y1, x2, y2]'}), 400
+    if len(regions) > max_regions:
+        return jsonify({'error': f'Too many regions. Max: {max_regions}'}), 400
+    try:
+        regions = [[float(v) for v in region] for region in regions]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'regions must be a non-empty list of [x1, y1, x2, y2]'}), 400
+    if not all(math.isfinite(v) for region in regions for v in region):
+        return jsonify({'error': 'Region coordinates must be finite numbers'}), 400
+    if any(len(region) != 4 or region[2] <= region[0] or region[3] <= region[1] for region in regions):
+        return jsonify({'error': 'Each region must be [x1, y1, x2, y2] with x1 < x2 and y1 < y2'}), 400
+
+    profile = data.get('profile') or None
+    try:
+        OCRService.resolve_settings(profile)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'error_code': 'INVALID_PROFILE'}), 400
+
+    query = image.ocr_results.filter_by(status='completed')
+    if data.get('ocr_result_id'):
+        query = query.filter_by(id=data['ocr_result_id'])
+    ocr_result = query.order_by(OCRResult.id.desc()).first()
+    if not ocr_result:
+        return jsonify({'error': 'No completed OCR result for this image'}), 404
+
+    try:
+        start_time = time.time()
+
+        ctx = OCRResultService.load_page(image)
+        segments = OCRResultService.reocr_regions(ocr_result, ctx, regions, profile=profile)
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'ocr_result_id': ocr_result.id,
+            'raw_text': ocr_result.raw_text,
+            'segments': [seg.to_dict() for seg in segments],
+            'processing_time_ms': int((time.time() - start_time) * 1000)
         })
 
     except Exception as e:
@@ -162,4 +456,126 @@ def single_image_ocr():
         return jsonify({'error': str(e)}), 500
 
 
+def _iter_batch_files():
+    """
+    Yield (filename, stream, mime_type) for every page of a batch request,
+    in upload order. Files named *.zip are expanded in name order.
+    """
+    for file in request.files.getlist('images'):
+        if file.filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(file.stream) as archive:
+                members = sorted(
+                    (m for m in archive.infolist() if not m.is_dir()),
+                    key=lambda m: m.filename
+                )
+                for member in members:
+                    name = secure_filename(os.path.basename(member.filename))
+                    if not name or not allowed_file(name):
+                        continue
+                    with archive.open(member) as stream:
+                        yield name, stream, None
+        elif file.filename:
+            if not allowed_file(file.filename):
+                raise ValueError(f'{file.filename}: invalid file type. Allowed: jpg, jpeg, png, zip')
+            yield secure_filename(file.filename), file.stream, file.content_type
+
+
+@ocr_bp.route('/batch', methods=['POST'])
+@login_required
+def batch_ocr():
+    """
+    OCR many pages into one Work.
+    Form field `images`: several image files and/or zip archives of images.
+    Pages are processed in the background; poll GET /batch/<work_id>.
+    """
+    if not request.files.getlist('images'):
+        return jsonify({'error': 'No image files provided'}), 400
+
+    profile = request.form.get('profile') or None
+    try:
+        OCRService.resolve_settings(profile)
+    except ValueError as e:
+        return jsonify({'error': str(e), 'error_code': 'INVALID_PROFILE'}), 400
+
+    max_files = current_app.config.get('OCR_BATCH_MAX_FILES', 200)
+    max_size = current_app.config.get('MAX_CONTENT_LENGTH', 5 * 1024 * 1024)
+    upload_folder = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+
+    images = []
+    try:
+        for filename, stream, mime_type in _iter_batch_files():
+            if len(images) >= max_files:
+                raise ValueError(f'Too many pages. Max {max_files} per batch')
+            images.append(OCRResultService.save_upload_stream(
+                current_user.id, filename, stream, upload_folder, max_size, mime_type=mime_type
+            ))
+
+        if not images:
+            raise ValueError('No valid image found in upload')
+
+        title = request.form.get('title') or f'Batch OCR ({len(images)} pages)'
+        work = OCRBatchService.create_batch(current_user.id, title, images, profile)
+        db.session.commit()
+    except (ValueError, zipfile.BadZipFile) as e:
+        db.session.rollback()
+        for image in images:
+            if os.path.exists(image.file_path):
+                os.remove(image.file_path)
+        return jsonify({'error': str(e)}), 400
+
+    OCRBatchService.start(current_app._get_current_object(), work.id)
+
+    return jsonify({'success': True, **OCRBatchService.progress(work)}), 202
+
+
+@ocr_bp.route('/batch/<int:work_id>', methods=['GET'])
+@login_required
+def get_batch_ocr(work_id):
+    """Per-page progress and total wall time of a batch"""
+    work = Work.query.filter_by(id=work_id, user_id=current_user.id).first()
+    if not work:
+        return jsonify({'error': 'Batch not found'}), 404
+
+    # end the current transaction so progress reflects the latest commits
+    db.session.rollback()
+    return jsonify(OCRBatchService.progress(work))
+
+
+@ocr_bp.route('/cache/stats', methods=['GET'])
+@login_required
+def ocr_cache_stats():
+    """
+    Checksum / near-duplicate reuse hit rates of this worker process, crop
+    recognition cache hit rate of the process running VietOCR
+    """
+    try:
+        recognition = get_recognition_cache_stats()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'error_code': 'MODEL_SERVER_ERROR'}), 503
+    return jsonify(dict(
+        OCRCacheService.stats(),
+        near_duplicate=NearDuplicateService.stats(),
+        recognition=recognition
+    ))
+
+
+@ocr_bp.route('/scheduler/stats', methods=['GET'])
+@login_required
+def ocr_scheduler_stats():
+    """VietOCR micro-batching queue depth and batch sizes (model server or this worker process)"""
+    try:
+        stats = get_vietocr_scheduler_stats()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'error_code': 'MODEL_SERVER_ERROR'}), 503
+    if stats is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(stats, enabled=True))
+
 
+@ocr_bp.route('/profiles', methods=['GET'])
+def get_ocr_profiles():
+    """Available OCR speed / quality profiles"""
+    return jsonify({
+        'default': OCRService.resolve_settings()['name'],
+        'profiles': OCR_PROFILES
+    })
@@ -6,7 +6,10 @@ from app.services.translate_service import TranslateService
 from app.services.research_service import ResearchService
 
 from app.services.summarize_service import SummarizeService
-from app.services.model_inference import run_bart_model, model as bart_model
+from app.services.model_inference import (
+    run_bart_model, is_bart_available, is_bart_ready, warm_up_bart, get_bart_cache_stats,
+    get_bart_filter_stats
+)
 
 tools_bp = Blueprint('tools', __name__)
 
@@ -255,13 +258,21 @@ def bart_correction():
     Request: { "text": "..." }
     Response: original_text, corrected_text, evaluation stats
     """
-    # Check if BART model is loaded
-    if bart_model is None:
+    # Check if BART model is loaded (it is loaded on first use)
+    if not is_bart_ready():
+        if not is_bart_available():
+            return jsonify({
+                'success': False,
+                'error': 'BART model chưa được load. Vui lòng kiểm tra folder models/bartpho_correction_model/',
+                'error_code': 'MODEL_NOT_LOADED'
+            }), 503
+
+        warm_up_bart(background=True)
         return jsonify({
             'success': False,
-            'error': 'BART model chưa được load. Vui lòng kiểm tra folder models/bartpho_correction_model/',
-            'error_code': 'MODEL_NOT_LOADED'
-        }), 503
+            'error': 'BART model đang được load, vui lòng thử lại sau vài giây',
+            'error_code': 'MODEL_LOADING'
+        }), 503, {'Retry-After': '10'}
 
     data = request.get_json()
     if not data or 'text' not in data:
@@ -349,3 +360,26 @@ def bart_correction():
             'error': str(e),
             'error_code': 'CORRECTION_FAILED'
         }), 500
+
+
+@tools_bp.route('/bart-correction/cache/stats', methods=['GET'])
+@login_required
+def bart_cache_stats():
+    """Chunk correction cache hit rate of BART (model server or this worker process)"""
+    try:
+        stats = get_bart_cache_stats()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'error_code': 'MODEL_SERVER_ERROR'}), 503
+    if stats is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(stats, enabled=True))
+
+
+@tools_bp.route('/bart-correction/filter/stats', methods=['GET'])
+@login_required
+def bart_filter_stats():
+    """Share of chunks the lexicon pre-filter let skip BART (model server or this worker process)"""
+    try:
+        return jsonify(get_bart_filter_stats())
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'error_code': 'MODEL_SERVER_ERROR'}), 503
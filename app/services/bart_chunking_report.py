@@ -0,0 +1,91 @@
+"""
+Chunking report: generate calls of the old ~200-character chunks vs token-budget chunks
+
+    python -m app.services.bart_chunking_report FIXTURE_DIR
+
+FIXTURE_DIR holds OCR texts (.txt, UTF-8). Only the BART tokenizer is
+loaded. For every file, prints the number of chunks of both chunkers,
+the chunks the old one silently truncated at max_length (and the tokens
+lost), and the generate calls once chunks are batched (token_batches).
+"""
+import argparse
+import os
+
+from transformers import AutoTokenizer
+
+from app.services import model_inference
+from app.services.model_inference import (
+    GENERATION_PARAMS, MODEL_PATH, chunk_sentences, preprocess_for_model,
+    split_into_sentences, token_batches
+)
+
+
+def char_chunks(sentences, max_chars=200):
+    """Previous chunker: sentences packed under max_chars characters"""
+    chunks = []
+    current_chunk = ""
+    for sentence in sentences:
+        if len(current_chunk) + len(sentence) < max_chars:
+            current_chunk += " " + sentence if current_chunk else sentence
+        else:
+            if current_chunk:
+                chunks.append(current_chunk)
+            current_chunk = sentence
+    if current_chunk:
+        chunks.append(current_chunk)
+    return chunks
+
+
+def report_text(text):
+    tokenizer = model_inference.tokenizer
+    sentences = split_into_sentences(preprocess_for_model(text))
+    max_length = GENERATION_PARAMS["max_length"]
+
+    old_lengths = [len(ids) for ids in tokenizer(char_chunks(sentences))["input_ids"]] if sentences else []
+    new_lengths = [len(ids) for _, ids in chunk_sentences(sentences)]
+
+    return {
+        'old_chunks': len(old_lengths),
+        'old_truncated': sum(1 for n in old_lengths if n > max_length),
+        'old_lost_tokens': sum(n - max_length for n in old_lengths if n > max_length),
+        'old_batches': len(token_batches([min(n, max_length) for n in old_lengths])),
+        'new_chunks': len(new_lengths),
+        'new_batches': len(token_batches(new_lengths)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate calls of char vs token-budget chunking")
+    parser.add_argument('fixture_dir')
+    args = parser.parse_args()
+
+    if model_inference.tokenizer is None:
+        model_inference.tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+
+    names = sorted(name for name in os.listdir(args.fixture_dir) if name.endswith('.txt'))
+    if not names:
+        raise SystemExit(f"No .txt fixtures in {args.fixture_dir}")
+
+    keys = ('old_chunks', 'old_truncated', 'old_lost_tokens', 'old_batches', 'new_chunks', 'new_batches')
+    totals = dict.fromkeys(keys, 0)
+
+    print(f"{'file':<30} {'old chunks':>10} {'truncated':>9} {'lost tok':>8} {'old batches':>11} "
+          f"{'new chunks':>10} {'new batches':>11}")
+    for name in names:
+        with open(os.path.join(args.fixture_dir, name), 'r', encoding='utf-8') as f:
+            row = report_text(f.read())
+        for key in keys:
+            totals[key] += row[key]
+        print(f"{name:<30} {row['old_chunks']:>10} {row['old_truncated']:>9} {row['old_lost_tokens']:>8} "
+              f"{row['old_batches']:>11} {row['new_chunks']:>10} {row['new_batches']:>11}")
+
+    print(f"{'total':<30} {totals['old_chunks']:>10} {totals['old_truncated']:>9} {totals['old_lost_tokens']:>8} "
+          f"{totals['old_batches']:>11} {totals['new_chunks']:>10} {totals['new_batches']:>11}")
+    print(f"generate calls: {totals['old_chunks']} per-chunk before, "
+          f"{totals['new_chunks'] - totals['old_chunks']:+d} chunks with token budgets, "
+          f"{totals['new_batches']} batched calls now "
+          f"({totals['old_chunks'] - totals['new_batches']} saved, {len(names)} files)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Skip rate / quality check of the BART lexicon pre-filter against fixtures
+
+    python -m app.services.bart_filter_eval FIXTURE_DIR [--profile balanced] [--max-oov-rate 0.0]
+
+FIXTURE_DIR holds images (jpg / jpeg / png) with a ground-truth .txt of
+the same name (as for ocr_accuracy). Every fixture is OCR'd once, then
+corrected by BART on every chunk and with the lexicon pre-filter on.
+Prints CER per image (OCR only, BART, BART + filter), the CER / WER
+delta of the filter, the share of chunks it skipped and the speedup.
+"""
+import argparse
+import time
+
+try:
+    from jiwer import cer, wer
+except ImportError:  # listed in requirements.txt (evaluation scripts)
+    raise SystemExit("jiwer is required: pip install jiwer")
+
+from app.config import Config
+from app.services import model_inference
+from app.services.ocr_accuracy import load_fixtures, normalize_text
+from app.services.ocr_service import OCRService, init_ocr_reader
+
+
+def score(reference, hypothesis, metric):
+    hypothesis = normalize_text(hypothesis)
+    return metric(reference, hypothesis) if reference else float(bool(hypothesis))
+
+
+def run_bart(texts, lexicon_filter):
+    """Correct every OCR text, returns ({name: corrected}, total seconds)"""
+    model_inference.LEXICON_FILTER = lexicon_filter
+
+    corrected = {}
+    total = 0.0
+    for name, text in texts.items():
+        start = time.perf_counter()
+        corrected[name] = model_inference.run_bart_model(text)
+        total += time.perf_counter() - start
+    return corrected, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skip rate and CER / WER of the BART lexicon pre-filter")
+    parser.add_argument('fixture_dir')
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--max-oov-rate', type=float, default=model_inference.MAX_OOV_RATE)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixture_dir)
+    if not fixtures:
+        raise SystemExit(f"No fixtures in {args.fixture_dir}")
+
+    init_ocr_reader(Config.OCR_LANGUAGES)
+    texts = {
+        name: OCRService.segments_to_text(OCRService.extract_text(image_bytes, profile=args.profile))
+        for name, image_bytes, _ in fixtures
+    }
+    references = {name: reference for name, _, reference in fixtures}
+
+    if model_inference.load_bart_model(warm_up=True) is None:
+        raise SystemExit("BART model is not available")
+    # every run must reach the model: no cached corrections
+    model_inference._correction_cache = None
+    model_inference.MAX_OOV_RATE = args.max_oov_rate
+
+    full, full_time = run_bart(texts, lexicon_filter=False)
+    filtered, filtered_time = run_bart(texts, lexicon_filter=True)
+
+    print(f"{'image':<30} {'CER ocr':>8} {'CER bart':>9} {'CER filter':>11} {'delta':>8}")
+    totals = {'ocr': 0.0, 'bart': 0.0, 'filter': 0.0, 'wer_bart': 0.0, 'wer_filter': 0.0}
+    for name in texts:
+        row = {
+            'ocr': score(references[name], texts[name], cer),
+            'bart': score(references[name], full[name], cer),
+            'filter': score(references[name], filtered[name], cer),
+            'wer_bart': score(references[name], full[name], wer),
+            'wer_filter': score(references[name], filtered[name], wer),
+        }
+        for key in totals:
+            totals[key] += row[key]
+        print(f"{name:<30} {row['ocr']:8.4f} {row['bart']:9.4f} {row['filter']:11.4f} "
+              f"{row['filter'] - row['bart']:+8.4f}")
+
+    mean = {key: value / len(texts) for key, value in totals.items()}
+    print(f"{'mean':<30} {mean['ocr']:8.4f} {mean['bart']:9.4f} {mean['filter']:11.4f} "
+          f"{mean['filter'] - mean['bart']:+8.4f}")
+    print(f"WER bart {mean['wer_bart']:.4f}, filter {mean['wer_filter']:.4f} "
+          f"({mean['wer_filter'] - mean['wer_bart']:+.4f})")
+
+    stats = model_inference.get_bart_filter_stats()
+    print(f"chunks skipped {stats['skipped']}/{stats['chunks']} ({stats['skip_rate']:.1%}, "
+          f"max OOV rate {args.max_oov_rate}), time bart {full_time:.2f}s, filter {filtered_time:.2f}s, "
+          f"speedup {full_time / max(filtered_time, 1e-6):.2f}x ({len(texts)} images)")
+
+
+if __name__ == '__main__':
+    main()
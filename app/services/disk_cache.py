@@ -0,0 +1,127 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class DiskLRUCache:
+    """
+    In-process LRU in front of a persistent sqlite store
+
+    get() looks in memory first, then on disk (promoting the entry to
+    memory); set() writes both. Values are anything JSON can encode. The
+    sqlite file can be shared by several processes (WAL mode); when it grows
+    past max_disk_items the oldest entries are pruned.
+
+    path=None keeps the cache in memory only.
+    """
+
+    PRUNE_EVERY = 1000  # sets between disk size checks
+
+    def __init__(self, path=None, max_items=10000, max_disk_items=1000000):
+        self.path = path
+        self.max_items = max(1, int(max_items))
+        self.max_disk_items = max_disk_items
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._conn = None
+        self._sets = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # a lost tail of entries on power failure is harmless for a cache
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_created_at ON cache (created_at)")
+            self._conn.commit()
+
+    def get(self, key):
+        """Cached value or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.disk_hits += 1
+            value = json.loads(row[0])
+            self._remember(key, value)
+            return value
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    def set_many(self, items):
+        """Store [(key, value)] in one disk transaction"""
+        if not items:
+            return
+
+        with self._lock:
+            for key, value in items:
+                self._remember(key, value)
+
+            if self._conn is None:
+                return
+
+            now = time.time()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, created_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False), now) for key, value in items]
+            )
+            self._conn.commit()
+
+            before = self._sets
+            self._sets += len(items)
+            if self.max_disk_items and self._sets // self.PRUNE_EVERY > before // self.PRUNE_EVERY:
+                self._prune()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _prune(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        excess = count - self.max_disk_items
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY created_at LIMIT ?)",
+                (excess,)
+            )
+            self._conn.commit()
+
+    def stats(self):
+        """Hit / miss counters of this process"""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'lookups': lookups,
+                'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+                'memory_items': len(self._memory),
+            }
@@ -0,0 +1,80 @@
+import cv2
+import numpy as np
+
+
+class ImageContext:
+    """
+    One decoded upload shared by every OCR stage
+
+    The bytes are decoded once. Grayscale / RGB versions are derived lazily
+    and cached, detection runs on `processed` (or `gray`), and crops are
+    returned as NumPy views into `rgb` - no per-crop color conversion or copy.
+    scale_x / scale_y map original coordinates to detection coordinates.
+    """
+
+    def __init__(self, original):
+        self.original = original  # BGR, as decoded by OpenCV
+        self.height, self.width = original.shape[:2]
+        self.processed = None
+        self.preprocess_plan = None
+        self.profile = None
+        self.scale_x = 1.0
+        self.scale_y = 1.0
+        self._gray = None
+        self._rgb = None
+
+    @classmethod
+    def from_bytes(cls, image_bytes):
+        nparr = np.frombuffer(image_bytes, np.uint8)
+        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+        if img is None:
+            raise ValueError("Cannot decode image")
+
+        return cls(img)
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.original, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.original, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    def set_processed(self, processed):
+        """Store the detection image and the scale it was resized by"""
+        self.processed = processed
+        h, w = processed.shape[:2]
+        self.scale_x = w / self.width
+        self.scale_y = h / self.height
+
+    @property
+    def detection_image(self):
+        return self.processed if self.processed is not None else self.gray
+
+    def to_original(self, bbox):
+        """Map a detection-space box back to original image coordinates"""
+        return [
+            [int(round(p[0] / self.scale_x)), int(round(p[1] / self.scale_y))]
+            for p in bbox
+        ]
+
+    def crop(self, bbox, pad=0):
+        """
+        RGB view of the axis-aligned region around bbox (original coords),
+        grown by pad pixels on every side
+        Returns None when the region is empty
+        """
+        x1 = max(min(int(p[0]) for p in bbox) - pad, 0)
+        x2 = min(max(int(p[0]) for p in bbox) + pad, self.width)
+        y1 = max(min(int(p[1]) for p in bbox) - pad, 0)
+        y2 = min(max(int(p[1]) for p in bbox) + pad, self.height)
+
+        region = self.rgb[y1:y2, x1:x2]
+        if region.size == 0:
+            return None
+        return region
@@ -0,0 +1,106 @@
+"""Perceptual hash of uploads and a BK-tree for Hamming-distance lookups"""
+import cv2
+import numpy as np
+
+
+HASH_SIZE = 16  # 16 x 16 gradient bits = 256-bit hash, 64 hex chars
+
+# A pixel pair carries information when its gray levels differ by MIN_GRADIENT;
+# images with fewer such pairs (blank, a line or a few lines of text) get
+# hashes that differ only in those few bits, so two different ones can land
+# within the default max distance (12): they are not hashed at all
+MIN_GRADIENT = 4
+MIN_TRANSITIONS = 32
+
+
+def _thumbnail(gray, hash_size=HASH_SIZE):
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    return small.astype(np.int16)
+
+
+def dhash(gray, hash_size=HASH_SIZE) -> int:
+    """
+    Difference hash of a grayscale image
+    One bit per horizontally adjacent pixel pair of the image shrunk to
+    (hash_size + 1) x hash_size: re-scans and re-compressions of a page keep
+    almost every bit, a different page flips about half of them.
+    """
+    small = _thumbnail(gray, hash_size)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def transitions(gray, hash_size=HASH_SIZE) -> int:
+    """Adjacent pixel pairs of the hash thumbnail differing by MIN_GRADIENT or more"""
+    small = _thumbnail(gray, hash_size)
+    return int((np.abs(small[:, 1:] - small[:, :-1]) >= MIN_GRADIENT).sum())
+
+
+def _dhash_hex(gray):
+    if gray is None or transitions(gray) < MIN_TRANSITIONS:
+        return None
+    return format(dhash(gray), f'0{HASH_SIZE * HASH_SIZE // 4}x')
+
+
+def phash_bytes(image_bytes: bytes):
+    """Hex dHash of encoded image bytes, None when they cannot be decoded or are too sparse"""
+    # the hash only needs a thumbnail: JPEG is decoded at 1/4 scale directly
+    return _dhash_hex(cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4))
+
+
+def phash_file(path: str):
+    """Hex dHash of an image file, None when it cannot be decoded or is too sparse"""
+    return _dhash_hex(cv2.imread(path, cv2.IMREAD_REDUCED_GRAYSCALE_4))
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes with the Hamming metric
+
+    Every child of a node sits at a fixed distance from it, so a radius
+    query only descends into children whose edge distance is within
+    radius of the query's distance to the node (triangle inequality)
+    instead of comparing against every stored hash.
+    """
+
+    def __init__(self):
+        self._root = None  # [hash, [values], {distance: child}]
+        self.size = 0
+
+    def add(self, value_hash: int, value) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = [value_hash, [value], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(value_hash, node[0])
+            if distance == 0:
+                node[1].append(value)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value_hash, [value], {}]
+                return
+            node = child
+
+    def search(self, query_hash: int, radius: int) -> list:
+        """[(distance, value)] of every stored hash within radius, nearest first"""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(query_hash, node[0])
+            if distance <= radius:
+                found.extend((distance, value) for value in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+
+        found.sort(key=lambda item: item[0])
+        return found
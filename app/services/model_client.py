@@ -0,0 +1,142 @@
+"""Client side of the model server (app/services/model_server.py)"""
+import threading
+import time
+from multiprocessing.connection import Client
+from typing import Optional
+
+from app.services.shared_array import SharedArray
+
+
+def parse_address(address: str):
+    """'host:port' -> TCP tuple, anything else is a Unix socket / named pipe path"""
+    if ':' in address and not address.startswith(('/', '\\\\')):
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+    return address
+
+
+class ModelServerError(RuntimeError):
+    """Raised when the model server reports a failed call"""
+
+
+class ModelClient:
+    """
+    Calls into the model server process
+
+    One connection per thread (a Connection is not safe to share), opened
+    lazily and reopened once if the server was restarted. Images are handed
+    over in shared memory; only their descriptor goes over the socket.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = parse_address(address)
+        self.authkey = authkey
+        self.server_info = {}
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+    def call(self, op: str, **kwargs):
+        message = dict(kwargs, op=op)
+
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.send(message)
+                reply = conn.recv()
+                break
+            except (EOFError, OSError):
+                self._drop_connection()
+                if attempt:
+                    raise
+
+        if not reply['ok']:
+            raise ModelServerError(reply['error'])
+        return reply['result']
+
+    def info(self) -> dict:
+        """Languages, default profile and which models the server loaded"""
+        self.server_info = self.call('info')
+        return self.server_info
+
+    def extract_text(self, image, preprocess=None, use_vietocr=None, profile=None) -> dict:
+        """
+        OCR a decoded BGR image on the server
+        Returns {'segments', 'preprocess_plan', 'profile'}
+        """
+        with SharedArray.create(image) as shared:
+            return self.call(
+                'ocr', image=shared.descriptor,
+                preprocess=preprocess, use_vietocr=use_vietocr, profile=profile
+            )
+
+    def recognize_region(self, region_image, boxes=None, profile=None) -> list:
+        """Re-OCR a region (BGR) on the server, returns its segments"""
+        with SharedArray.create(region_image) as shared:
+            return self.call('ocr_region', image=shared.descriptor, boxes=boxes, profile=profile)
+
+    def recognition_cache_stats(self):
+        """VietOCR crop recognition cache counters of the server"""
+        return self.call('recognition_cache_stats')
+
+    def scheduler_stats(self):
+        """VietOCR micro-batching scheduler stats of the server"""
+        return self.call('scheduler_stats')
+
+    def correct_text(self, text: str) -> str:
+        """BART correction on the server"""
+        return self.call('bart', text=text)
+
+    def bart_cache_stats(self):
+        """BART correction cache counters of the server"""
+        return self.call('bart_cache_stats')
+
+    def bart_filter_stats(self) -> dict:
+        """BART lexicon pre-filter counters of the server"""
+        return self.call('bart_filter_stats')
+
+
+_client: Optional[ModelClient] = None
+
+
+def connect_model_server(address: str, authkey: bytes, timeout: float = 30) -> dict:
+    """
+    Use the model server for this process, waiting up to timeout seconds
+    for it to come up. Returns the server info.
+    """
+    global _client
+
+    client = ModelClient(address, authkey)
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            info = client.info()
+            break
+        except (ConnectionRefusedError, FileNotFoundError):
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Model server not reachable at {address}")
+            time.sleep(0.5)
+
+    _client = client
+    print(f"[Models] Using model server at {address}")
+    return info
+
+
+def get_model_client() -> Optional[ModelClient]:
+    """The model server client, None when models are loaded in-process"""
+    return _client
@@ -1,9 +1,15 @@
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import re
+import hashlib
+import json
+import threading
+import unicodedata
 import torch
 import sentencepiece
 import os
 from dotenv import load_dotenv
+from app.services.disk_cache import DiskLRUCache
+from app.services.model_client import get_model_client
+from app.services.vietnamese_lexicon import oov_rate
 
 load_dotenv()
 
@@ -17,22 +23,143 @@ device = None
 
 USE_BART = os.getenv("USE_BART_MODEL", "true").lower() == "true"
 
-if USE_BART and os.path.exists(MODEL_PATH):
-    print("🔄 Loading BART model... (only once)")
-    tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
-    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH)
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model = model.to(device)
-    print("✅ BART model loaded on:", device)
-elif not USE_BART:
-    print("⚠️ BART model disabled via USE_BART_MODEL=false")
-else:
-    print("⚠️ BART model not found at:", MODEL_PATH)
+GENERATION_PARAMS = {
+    "max_length": 256,
+    "num_beams": 4,
+    "length_penalty": 1.0,
+    "early_stopping": True,
+}
+# Input tokens per chunk (special tokens included), a little under
+# max_length so the corrected output is not cut off either
+CHUNK_TOKENS = int(os.getenv("BART_CHUNK_TOKENS", 240))
+# Batched generate: padded input tokens x beams per call, and chunks per call
+BATCH_TOKENS = int(os.getenv("BART_BATCH_TOKENS", 8192))
+MAX_BATCH_SIZE = int(os.getenv("BART_MAX_BATCH_SIZE", 16))
+# Chunk correction cache: in-memory LRU entries (0 = off) + sqlite file
+CACHE_SIZE = int(os.getenv("BART_CACHE_SIZE", 10000))
+CACHE_PATH = os.getenv("BART_CACHE_PATH", os.path.join(BASE_DIR, "cache", "bart_correction.sqlite3"))
+# Lexicon pre-filter: chunks whose share of words outside the Vietnamese
+# syllable lexicon is at most BART_MAX_OOV_RATE skip BART unchanged
+LEXICON_FILTER = os.getenv("BART_LEXICON_FILTER", "false").lower() == "true"
+MAX_OOV_RATE = float(os.getenv("BART_MAX_OOV_RATE", 0.0))
+
+_load_lock = threading.Lock()
+_ready = threading.Event()  # model loaded (and warmed up) in this process
+_load_error = None
+_warmup_started = False
+_correction_cache = None
+_model_version = None
+_filter_lock = threading.Lock()
+_filter_chunks = 0
+_filter_skipped = 0
+
+WARMUP_TEXT = "xin chào việt nam"
+
+
+def load_bart_model(warm_up: bool = False):
+    """
+    Load BART into this process on first use (once, thread-safe)
+    Nothing is loaded at import: processes that never correct text do not
+    pay for transformers / the model. warm_up also runs one short generate
+    so the first real request does not pay for lazy allocations.
+    Sets the readiness flag (is_bart_ready) when done.
+    """
+    global tokenizer, model, device, _load_error, _correction_cache, _model_version
+
+    if _ready.is_set():
+        return model
+
+    with _load_lock:
+        if _ready.is_set() or _load_error is not None:
+            return model
+
+        if not USE_BART:
+            _load_error = "disabled"
+            print("⚠️ BART model disabled via USE_BART_MODEL=false")
+            return None
+        if not os.path.exists(MODEL_PATH):
+            _load_error = "not found"
+            print("⚠️ BART model not found at:", MODEL_PATH)
+            return None
+
+        try:
+            from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+            print("🔄 Loading BART model... (only once)")
+            tokenizer = AutoTokenizer.from_pretrained(MODEL_PATH)
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_PATH).to(device)
+            print("✅ BART model loaded on:", device)
+
+            if CACHE_SIZE and _correction_cache is None:
+                _model_version = _bart_model_version()
+                _correction_cache = DiskLRUCache(CACHE_PATH, max_items=CACHE_SIZE)
+
+            if warm_up:
+                process_chunks([WARMUP_TEXT])
+                print("✅ BART warm-up done")
+        except Exception as e:
+            _load_error = str(e)
+            tokenizer = model = None
+            print(f"⚠️ BART load error: {e}")
+            return None
+
+        _ready.set()
+
+    return model
+
+
+def _bart_model_version():
+    """Identifies what BART outputs depend on (correction cache key)"""
+    import transformers
+
+    digest = hashlib.blake2b(digest_size=8)
+    for name in sorted(os.listdir(MODEL_PATH)):
+        path = os.path.join(MODEL_PATH, name)
+        if os.path.isfile(path):
+            stat = os.stat(path)
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    digest.update(json.dumps(GENERATION_PARAMS, sort_keys=True).encode())
+    return f"bartpho-{transformers.__version__}-{digest.hexdigest()}"
+
+
+def warm_up_bart(background: bool = True) -> None:
+    """
+    Warm-up hook: load BART (and run one generate) ahead of the first
+    request, in a daemon thread by default. Started at most once.
+    """
+    global _warmup_started
+
+    with _load_lock:
+        if _warmup_started or _ready.is_set():
+            return
+        _warmup_started = True
+
+    if background:
+        threading.Thread(target=load_bart_model, args=(True,), name='bart-warmup', daemon=True).start()
+    else:
+        load_bart_model(warm_up=True)
+
+
+def is_bart_ready() -> bool:
+    """Readiness flag: BART is loaded and can correct text right now"""
+    client = get_model_client()
+    if client is not None:
+        return client.server_info['bart']
+    return _ready.is_set()
+
+
+def is_bart_available() -> bool:
+    """BART is loaded or can be loaded (enabled, files present, no load error)"""
+    client = get_model_client()
+    if client is not None:
+        return client.server_info['bart']
+    return _ready.is_set() or (USE_BART and os.path.exists(MODEL_PATH) and _load_error is None)
 
 
 def preprocess_for_model(text: str):
-    # Chỉ chuẩn hóa khoảng trắng, giữ nguyên text gốc
-    return re.sub(r"\s+", " ", text).strip()
+    # Chỉ chuẩn hóa Unicode (NFC) và khoảng trắng, giữ nguyên text gốc
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
 
 
 def split_into_sentences(text: str) -> list:
@@ -42,30 +169,206 @@ def split_into_sentences(text: str) -> list:
     return [s.strip() for s in sentences if s.strip()]
 
 
+def _split_ids(ids: list, limit: int) -> list:
+    """Cut the token ids of an over-long sentence into parts of at most limit, at word starts"""
+    tokens = tokenizer.convert_ids_to_tokens(ids)
+    parts = []
+    start = 0
+
+    while len(ids) - start > limit:
+        end = start + limit
+        # SentencePiece marks the first piece of a word with "▁"
+        cut = next((j for j in range(end, start, -1) if tokens[j].startswith("▁")), end)
+        parts.append(ids[start:cut])
+        start = cut
+
+    parts.append(ids[start:])
+    return parts
+
+
+def chunk_sentences(sentences: list) -> list:
+    """
+    Gộp câu thành chunks theo số token thật của tokenizer
+    Every sentence is tokenized once; chunks are packed up to CHUNK_TOKENS
+    and their input ids are the concatenated sentence ids, so nothing is
+    tokenized again or truncated. Sentences longer than the limit are split
+    at word boundaries.
+    Returns [(chunk text, input ids)]
+    """
+    limit = CHUNK_TOKENS - tokenizer.num_special_tokens_to_add()
+    encoded = tokenizer(sentences, add_special_tokens=False)["input_ids"] if sentences else []
+
+    pieces = []
+    for sentence, ids in zip(sentences, encoded):
+        if len(ids) <= limit:
+            pieces.append((sentence, ids))
+        else:
+            pieces.extend((tokenizer.decode(part), part) for part in _split_ids(ids, limit))
+
+    chunks = []
+    texts = []
+    current = []
+    for text, ids in pieces:
+        if current and len(current) + len(ids) > limit:
+            chunks.append((" ".join(texts), tokenizer.build_inputs_with_special_tokens(current)))
+            texts = []
+            current = []
+        texts.append(text)
+        current.extend(ids)
+
+    if current:
+        chunks.append((" ".join(texts), tokenizer.build_inputs_with_special_tokens(current)))
+    return chunks
+
+
 def process_chunk(chunk: str) -> str:
     """Xử lý một chunk text qua BART"""
-    inputs = tokenizer(
-        chunk,
-        return_tensors="pt",
-        max_length=256,
-        truncation=True,
-        padding=True
-    ).to(device)
-
-    with torch.no_grad():
-        output_ids = model.generate(
-            **inputs,
-            max_length=256,
-            num_beams=4,
-            length_penalty=1.0,
-            early_stopping=True
-        )
-
-    return tokenizer.decode(output_ids[0], skip_special_tokens=True)
+    return process_chunks([chunk])[0]
+
+
+def token_batches(lengths: list) -> list:
+    """
+    Group chunk indices into generate batches, longest first
+    A batch is padded to its longest chunk: its cost is that length x
+    batch size x beams, kept under BATCH_TOKENS (a single chunk always fits).
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    beams = GENERATION_PARAMS["num_beams"]
+    batches = []
+    batch = []
+
+    for i in order:
+        # sorted longest first: the batch's padded length is its first chunk's
+        longest = lengths[batch[0]] if batch else lengths[i]
+        if batch and (len(batch) >= MAX_BATCH_SIZE or longest * (len(batch) + 1) * beams > BATCH_TOKENS):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def process_chunks(chunks: list, encoded: list = None) -> list:
+    """
+    Xử lý nhiều chunk qua BART bằng batched generate
+    encoded: input ids of the chunks (chunk_sentences), tokenized here if None.
+    Chunks are sorted by token length and batched under a token budget
+    (token_batches); outputs come back in input order.
+    """
+    if encoded is None:
+        encoded = [
+            tokenizer(chunk, max_length=GENERATION_PARAMS["max_length"], truncation=True)["input_ids"]
+            for chunk in chunks
+        ]
+    results = [None] * len(chunks)
+
+    for batch in token_batches([len(ids) for ids in encoded]):
+        inputs = tokenizer.pad(
+            {"input_ids": [encoded[i] for i in batch]},
+            padding=True,
+            return_tensors="pt"
+        ).to(device)
+
+        with torch.no_grad():
+            output_ids = model.generate(**inputs, **GENERATION_PARAMS)
+
+        for i, corrected in zip(batch, tokenizer.batch_decode(output_ids, skip_special_tokens=True)):
+            results[i] = corrected
+
+    return results
+
+
+def _correction_key(chunk: str) -> str:
+    """
+    Cache key of a chunk: its text (already NFC / whitespace-normalized
+    by preprocess_for_model) under the model version and generate params
+    """
+    digest = hashlib.blake2b(chunk.encode("utf-8"), digest_size=16)
+    return f"{_model_version}:{digest.hexdigest()}"
+
+
+def correct_chunks(packed: list) -> list:
+    """
+    Corrected text of packed chunks [(text, input ids)], in order
+    Chunks already corrected (headers, footers, boilerplate repeated
+    across pages and requests) come from the correction cache; only the
+    misses go through process_chunks.
+    """
+    if _correction_cache is None:
+        return process_chunks([chunk for chunk, _ in packed], [ids for _, ids in packed])
+
+    keys = [_correction_key(chunk) for chunk, _ in packed]
+    results = [_correction_cache.get(key) for key in keys]
+    # chunks repeated inside the request are generated once too
+    misses = {}
+    for i, result in enumerate(results):
+        if result is None:
+            misses.setdefault(keys[i], []).append(i)
+
+    if misses:
+        first = [indices[0] for indices in misses.values()]
+        corrected = process_chunks([packed[i][0] for i in first], [packed[i][1] for i in first])
+        for indices, result in zip(misses.values(), corrected):
+            for i in indices:
+                results[i] = result
+        _correction_cache.set_many(list(zip(misses, corrected)))
+
+    print(f"♻️ BART cache: {len(packed) - len(misses)}/{len(packed)} chunks reused")
+    return results
+
+
+def needs_correction(chunk: str) -> bool:
+    """
+    Lexicon pre-filter: False when the chunk already looks clean (OOV rate
+    at most MAX_OOV_RATE), always True when the filter is off
+    """
+    global _filter_chunks, _filter_skipped
+
+    if not LEXICON_FILTER:
+        return True
+
+    suspicious = oov_rate(chunk) > MAX_OOV_RATE
+    with _filter_lock:
+        _filter_chunks += 1
+        _filter_skipped += not suspicious
+    return suspicious
+
+
+def get_bart_filter_stats():
+    """Chunks checked / skipped by the lexicon pre-filter"""
+    client = get_model_client()
+    if client is not None:
+        return client.bart_filter_stats()
+    with _filter_lock:
+        return {
+            'enabled': LEXICON_FILTER,
+            'max_oov_rate': MAX_OOV_RATE,
+            'chunks': _filter_chunks,
+            'skipped': _filter_skipped,
+            'skip_rate': round(_filter_skipped / _filter_chunks, 4) if _filter_chunks else 0.0
+        }
+
+
+def get_bart_cache_stats():
+    """Chunk correction cache counters, None when the cache is off or not created yet"""
+    client = get_model_client()
+    if client is not None:
+        return client.bart_cache_stats()
+    return _correction_cache.stats() if _correction_cache is not None else None
 
 
 def run_bart_model(text: str) -> str:
-    if model is None or tokenizer is None:
+    client = get_model_client()
+    if client is not None:
+        try:
+            return client.correct_text(text)
+        except Exception as e:
+            print(f"⚠️ BART error: {e}")
+            return text
+
+    if load_bart_model() is None:
         return text  # Return original if model not loaded
 
     try:
@@ -75,25 +378,22 @@ def run_bart_model(text: str) -> str:
         # Chia thành các câu
         sentences = split_into_sentences(processed_text)
         
-        # Gộp câu thành chunks (~200 chars mỗi chunk)
-        chunks = []
-        current_chunk = ""
-        for sentence in sentences:
-            if len(current_chunk) + len(sentence) < 200:
-                current_chunk += " " + sentence if current_chunk else sentence
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk)
-                current_chunk = sentence
-        if current_chunk:
-            chunks.append(current_chunk)
-
-        # Xử lý từng chunk
-        results = []
-        for i, chunk in enumerate(chunks):
-            corrected = process_chunk(chunk)
-            results.append(corrected)
-            print(f"  Chunk {i+1}/{len(chunks)}: {len(chunk)} → {len(corrected)} chars")
+        # Gộp câu thành chunks (≤ CHUNK_TOKENS tokens mỗi chunk)
+        packed = chunk_sentences(sentences)
+        chunks = [chunk for chunk, _ in packed]
+
+        # Chunk sạch (không có âm tiết lạ) giữ nguyên, không qua BART
+        suspicious = [i for i, (chunk, _) in enumerate(packed) if needs_correction(chunk)]
+        if len(suspicious) < len(packed):
+            print(f"⏭️ BART lexicon filter: {len(packed) - len(suspicious)}/{len(packed)} chunks clean")
+
+        # Xử lý các chunk theo batch (chunk đã có trong cache thì bỏ qua)
+        results = list(chunks)
+        if suspicious:
+            for i, corrected in zip(suspicious, correct_chunks([packed[i] for i in suspicious])):
+                results[i] = corrected
+        for i, ((chunk, ids), corrected) in enumerate(zip(packed, results)):
+            print(f"  Chunk {i+1}/{len(chunks)}: {len(chunk)} chars, {len(ids)} tokens → {len(corrected)} chars")
 
         result = " ".join(results)
         print(f"📤 BART output ({len(result)} chars)")
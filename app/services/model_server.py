@@ -0,0 +1,161 @@
+"""
+Model server: one process owning EasyOCR, VietOCR and BARTpho
+
+Web workers started with MODEL_SERVER_ADDRESS set do not load any model;
+OCR and BART calls go to this process instead (see model_client.py), so
+the number of web workers no longer multiplies model RAM.
+
+Run it before the web workers, with the same .env:
+
+    python -m app.services.model_server
+"""
+import os
+import threading
+from multiprocessing.connection import Listener
+
+from app.config import Config
+from app.services.model_client import parse_address
+from app.services.shared_array import SharedArray
+from app.services import model_inference
+from app.services import ocr_service
+from app.services.ocr_service import OCRService, init_ocr_reader
+from app.services.image_context import ImageContext
+
+
+class ModelServer:
+    """Accepts client connections and serves each one in its own thread"""
+
+    def __init__(self, address, authkey):
+        self.address = parse_address(address)
+        self.authkey = authkey
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # stale socket of a previous run
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"[Models] Model server listening on {listener.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # failed handshake (bad authkey) etc. must not stop the server
+                    print(f"[Models] Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self.dispatch(message))
+
+    def dispatch(self, message):
+        """Run one call; never raises, errors are returned to the client"""
+        op = message.get('op')
+
+        if op in ('ocr', 'ocr_region'):
+            # the shared segment must be released after _ocr has returned,
+            # when no frame holds a view of it anymore
+            try:
+                shared = SharedArray.attach(message['image'])
+            except Exception as e:
+                # stale / already unlinked segment name, malformed descriptor
+                return {'ok': False, 'error': f"Cannot attach image: {e}"}
+            try:
+                if op == 'ocr':
+                    return self._ocr(shared.array, message)
+                return self._ocr_region(shared.array, message)
+            finally:
+                shared.release()
+
+        try:
+            if op == 'info':
+                result = self._info()
+            elif op == 'recognition_cache_stats':
+                result = ocr_service.get_recognition_cache_stats()
+            elif op == 'scheduler_stats':
+                result = ocr_service.get_vietocr_scheduler_stats()
+            elif op == 'bart':
+                result = model_inference.run_bart_model(message['text'])
+            elif op == 'bart_cache_stats':
+                result = model_inference.get_bart_cache_stats()
+            elif op == 'bart_filter_stats':
+                result = model_inference.get_bart_filter_stats()
+            else:
+                raise ValueError(f"Unknown operation: {op}")
+            return {'ok': True, 'result': result}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    @staticmethod
+    def _info():
+        return {
+            'languages': ocr_service._ocr_languages,
+            'default_profile': ocr_service._default_profile,
+            'vietocr': ocr_service._vietocr_ready,
+            'quantized': ocr_service._quantized,
+            'precision': ocr_service._precision,
+            'bart': model_inference.is_bart_ready()
+        }
+
+    @staticmethod
+    def _ocr(image, message):
+        try:
+            ctx = ImageContext(image)
+            segments = OCRService.extract_text(
+                ctx,
+                preprocess=message.get('preprocess'),
+                use_vietocr=message.get('use_vietocr'),
+                profile=message.get('profile')
+            )
+            return {
+                'ok': True,
+                'result': {
+                    'segments': segments,
+                    'preprocess_plan': ctx.preprocess_plan,
+                    'profile': ctx.profile
+                }
+            }
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+    @staticmethod
+    def _ocr_region(image, message):
+        try:
+            segments = OCRService.recognize_region(
+                image, boxes=message.get('boxes'), profile=message.get('profile')
+            )
+            return {'ok': True, 'result': segments}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+
+
+def main():
+    address = Config.MODEL_SERVER_ADDRESS
+    if not address:
+        raise SystemExit("MODEL_SERVER_ADDRESS is not set")
+
+    init_ocr_reader(
+        Config.OCR_LANGUAGES,
+        vietocr_batch_size=Config.OCR_VIETOCR_BATCH_SIZE,
+        vietocr_bucket_width=Config.OCR_VIETOCR_BUCKET_WIDTH,
+        default_profile=Config.OCR_DEFAULT_PROFILE,
+        vietocr_batch_window_ms=Config.OCR_VIETOCR_BATCH_WINDOW_MS,
+        vietocr_scheduler_batch_size=Config.OCR_VIETOCR_SCHEDULER_BATCH_SIZE,
+        quantize=Config.OCR_CPU_QUANTIZE,
+        torch_threads=Config.OCR_TORCH_THREADS,
+        torchscript_dir=Config.OCR_TORCHSCRIPT_DIR,
+        recognition_cache_size=Config.OCR_RECOGNITION_CACHE_SIZE,
+        recognition_cache_path=Config.OCR_RECOGNITION_CACHE_PATH
+    )
+    model_inference.warm_up_bart(background=False)
+
+    ModelServer(address, Config.MODEL_SERVER_AUTHKEY.encode()).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
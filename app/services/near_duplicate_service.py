@@ -0,0 +1,118 @@
+"""Near-duplicate upload lookup on the perceptual hash of images"""
+import threading
+import time
+from typing import Optional, Tuple
+from sqlalchemy import or_, select
+from app import db
+from app.models import Image, OCRResult
+from app.services.image_hash import BKTree
+
+
+class NearDuplicateService:
+    """
+    Finds earlier uploads of (almost) the same page: re-scans or
+    re-compressed copies whose checksum differs but whose dHash is within
+    max_distance bits.
+
+    Each process keeps one BK-tree per user, filled from images.phash on
+    first use and topped up with newer rows on every lookup. Lookups are
+    limited to the uploader's own images.
+
+    Only committed rows are indexed (read on a separate connection, so a
+    request's own flushed upload, possibly rolled back later, never
+    enters the tree). Ids skipped below the newest indexed one may belong
+    to transactions still running (an upload being OCR'd): they are
+    re-checked on every refresh for GAP_TTL seconds.
+    """
+
+    MAX_CANDIDATES = 20  # nearest images checked for a reusable result
+    GAP_TTL = 600  # seconds an id gap is re-checked (longest upload transaction)
+
+    _lock = threading.Lock()
+    _trees = {}  # user_id -> BKTree of image ids
+    _last_image_id = 0
+    _gaps = {}  # missing image id below _last_image_id -> monotonic time seen
+    _lookups = 0
+    _hits = 0
+
+    @classmethod
+    def _refresh(cls) -> None:
+        """Index images committed since the last lookup (by any process)"""
+        now = time.monotonic()
+        cls._gaps = {image_id: seen for image_id, seen in cls._gaps.items() if now - seen < cls.GAP_TTL}
+
+        query = select(Image.id, Image.user_id, Image.phash).where(
+            or_(Image.id > cls._last_image_id, Image.id.in_(list(cls._gaps)))
+        ).order_by(Image.id)
+        with db.engine.connect() as conn:
+            rows = conn.execute(query).all()
+
+        first_load = cls._last_image_id == 0
+        for image_id, user_id, phash in rows:
+            cls._gaps.pop(image_id, None)
+            if image_id > cls._last_image_id:
+                if not first_load:
+                    for missing in range(cls._last_image_id + 1, image_id):
+                        cls._gaps[missing] = now
+                cls._last_image_id = image_id
+            if phash:
+                cls._trees.setdefault(user_id, BKTree()).add(int(phash, 16), image_id)
+
+    @classmethod
+    def find_similar(cls, image: Image, max_distance: int) -> list:
+        """
+        [(distance, image_id)] of the user's other images within max_distance
+        Ids of images deleted since they were indexed can still be returned
+        """
+        if not image.phash:
+            return []
+
+        with cls._lock:
+            cls._refresh()
+            tree = cls._trees.get(image.user_id)
+            found = tree.search(int(image.phash, 16), max_distance) if tree else []
+
+        return [(distance, image_id) for distance, image_id in found if image_id != image.id]
+
+    @classmethod
+    def find_result(cls, image: Image, fingerprint: str,
+                    max_distance: int) -> Optional[Tuple[OCRResult, int]]:
+        """
+        Latest completed result of the nearest similar image produced by
+        the same pipeline.
+
+        Returns:
+            (OCRResult, hamming distance) or None
+        """
+        candidates = cls.find_similar(image, max_distance)[:cls.MAX_CANDIDATES]
+        found = None
+
+        if candidates:
+            distances = {image_id: distance for distance, image_id in candidates}
+            # the join back to the database drops deleted images
+            results = OCRResult.query.filter(
+                OCRResult.image_id.in_(distances),
+                OCRResult.user_id == image.user_id,
+                OCRResult.pipeline_fingerprint == fingerprint,
+                OCRResult.status == 'completed'
+            ).order_by(OCRResult.id.desc()).all()
+
+            if results:
+                best = min(results, key=lambda result: distances[result.image_id])
+                found = (best, distances[best.image_id])
+
+        with cls._lock:
+            cls._lookups += 1
+            cls._hits += found is not None
+        return found
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Lookup counters and index size of this process"""
+        with cls._lock:
+            return {
+                'hits': cls._hits,
+                'lookups': cls._lookups,
+                'hit_rate': round(cls._hits / cls._lookups, 4) if cls._lookups else 0.0,
+                'indexed_images': sum(tree.size for tree in cls._trees.values())
+            }
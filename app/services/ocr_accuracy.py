@@ -0,0 +1,102 @@
+"""
+Accuracy / speed check of the int8-quantized VietOCR against fixtures
+
+    python -m app.services.ocr_accuracy FIXTURE_DIR [--profile balanced] [--threads 4]
+
+FIXTURE_DIR holds images (jpg / jpeg / png) with a ground-truth .txt of
+the same name. Every fixture is OCR'd with the fp32 models, then
+VietOCR is quantized (quantize_ocr_models) and the fixtures are
+OCR'd again. Prints CER per image and the CER delta next to the speedup.
+"""
+import argparse
+import os
+import re
+import time
+import unicodedata
+
+try:
+    from jiwer import cer
+except ImportError:  # listed in requirements.txt (evaluation scripts)
+    raise SystemExit("jiwer is required: pip install jiwer")
+
+from app.config import Config
+from app.services.ocr_service import OCRService, init_ocr_reader, quantize_ocr_models
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def normalize_text(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    text = text.lower()
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def load_fixtures(fixture_dir):
+    """[(name, image_bytes, reference_text)] for images with a .txt next to them"""
+    fixtures = []
+    for name in sorted(os.listdir(fixture_dir)):
+        stem, ext = os.path.splitext(name)
+        text_path = os.path.join(fixture_dir, stem + '.txt')
+        if ext.lower() not in IMAGE_EXTENSIONS:
+            continue
+        if not os.path.exists(text_path):
+            print(f"[WARN] Missing text file for {name}")
+            continue
+
+        with open(os.path.join(fixture_dir, name), 'rb') as f:
+            image_bytes = f.read()
+        with open(text_path, 'r', encoding='utf-8') as f:
+            reference = normalize_text(f.read())
+        fixtures.append((name, image_bytes, reference))
+    return fixtures
+
+
+def run_fixtures(fixtures, profile):
+    """OCR every fixture, returns ({name: cer}, total seconds)"""
+    # warm-up: first call pays for lazy allocations
+    OCRService.extract_text(fixtures[0][1], profile=profile)
+
+    scores = {}
+    total = 0.0
+    for name, image_bytes, reference in fixtures:
+        start = time.perf_counter()
+        segments = OCRService.extract_text(image_bytes, profile=profile)
+        total += time.perf_counter() - start
+
+        hypothesis = normalize_text(OCRService.segments_to_text(segments))
+        scores[name] = cer(reference, hypothesis) if reference else float(bool(hypothesis))
+    return scores, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CER / latency of fp32 vs int8 VietOCR")
+    parser.add_argument('fixture_dir')
+    parser.add_argument('--profile', default=None)
+    parser.add_argument('--threads', type=int, default=Config.OCR_TORCH_THREADS)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixture_dir)
+    if not fixtures:
+        raise SystemExit(f"No fixtures in {args.fixture_dir}")
+
+    init_ocr_reader(Config.OCR_LANGUAGES, torch_threads=args.threads)
+    fp32, fp32_time = run_fixtures(fixtures, args.profile)
+
+    quantize_ocr_models()
+    int8, int8_time = run_fixtures(fixtures, args.profile)
+
+    print(f"{'image':<30} {'CER fp32':>9} {'CER int8':>9} {'delta':>8}")
+    for name, _, _ in fixtures:
+        print(f"{name:<30} {fp32[name]:9.4f} {int8[name]:9.4f} {int8[name] - fp32[name]:+8.4f}")
+
+    mean_fp32 = sum(fp32.values()) / len(fp32)
+    mean_int8 = sum(int8.values()) / len(int8)
+    print(f"{'mean':<30} {mean_fp32:9.4f} {mean_int8:9.4f} {mean_int8 - mean_fp32:+8.4f}")
+    print(f"time fp32 {fp32_time:.2f}s, int8 {int8_time:.2f}s, "
+          f"speedup {fp32_time / int8_time:.2f}x ({len(fixtures)} images)")
+
+
+if __name__ == '__main__':
+    main()
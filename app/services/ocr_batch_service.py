@@ -0,0 +1,286 @@
+"""OCR Batch Service: multi-page OCR fanned out over a process pool"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+from app import db
+from app.models import OCRResult, Work, TextBlock
+from app.services.ocr_result_service import OCRResultService
+from app.services.ocr_cache_service import OCRCacheService
+from app.services.ocr_job_service import OCRJobService
+from app.services.ocr_service import OCRService, init_ocr_reader, use_model_server
+from app.services.image_context import ImageContext
+
+
+# ==================== WORKER PROCESS ====================
+
+def _init_worker(languages, vietocr_batch_size, vietocr_bucket_width, default_profile,
+                 quantize=False, torch_threads=0, torchscript_dir=None,
+                 recognition_cache_size=0, recognition_cache_path=None, model_server=None):
+    """Load the OCR models once per worker process (or use the model server)"""
+    if model_server is not None:
+        use_model_server(*model_server)
+        return
+
+    init_ocr_reader(
+        languages,
+        vietocr_batch_size=vietocr_batch_size,
+        vietocr_bucket_width=vietocr_bucket_width,
+        default_profile=default_profile,
+        quantize=quantize,
+        torch_threads=torch_threads,
+        torchscript_dir=torchscript_dir,
+        recognition_cache_size=recognition_cache_size,
+        recognition_cache_path=recognition_cache_path
+    )
+
+
+def _ocr_page(file_path, profile=None):
+    """OCR one stored page inside a worker process"""
+    start_time = time.time()
+    with open(file_path, 'rb') as f:
+        ctx = ImageContext.from_bytes(f.read())
+
+    segments = OCRService.extract_text(ctx, profile=profile)
+    return {
+        'segments': segments,
+        'preprocess_plan': ctx.preprocess_plan,
+        'profile': ctx.profile,
+        'processing_time_ms': int((time.time() - start_time) * 1000)
+    }
+
+
+# ==================== SERVICE ====================
+
+class OCRBatchService:
+    """
+    Runs the pages of one upload batch across a shared process pool.
+
+    Every page is an Image + OCRResult and one TextBlock (ordered by page)
+    of a single Work. The TextBlock is created up front with the page's
+    ocr_result_id in extra_data and filled in when the page completes, so
+    progress can be read back from the database at any time.
+    """
+
+    _lock = threading.Lock()
+    _pool: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def _get_pool(cls, app) -> ProcessPoolExecutor:
+        if cls._pool is not None:
+            return cls._pool
+
+        with cls._lock:
+            if cls._pool is None:
+                workers = app.config.get('OCR_BATCH_WORKERS', 2)
+                cls._pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    # spawn: workers must not inherit torch / CUDA state
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(
+                        app.config['OCR_LANGUAGES'],
+                        app.config.get('OCR_VIETOCR_BATCH_SIZE', 32),
+                        app.config.get('OCR_VIETOCR_BUCKET_WIDTH', 32),
+                        app.config.get('OCR_DEFAULT_PROFILE', 'balanced'),
+                        app.config.get('OCR_CPU_QUANTIZE', False),
+                        app.config.get('OCR_TORCH_THREADS', 0),
+                        app.config.get('OCR_TORCHSCRIPT_DIR'),
+                        app.config.get('OCR_RECOGNITION_CACHE_SIZE', 0),
+                        app.config.get('OCR_RECOGNITION_CACHE_PATH'),
+                        cls._model_server_args(app),
+                    )
+                )
+                print(f"[OCR] Batch pool started: {workers} worker processes")
+
+        return cls._pool
+
+    @staticmethod
+    def _model_server_args(app):
+        address = app.config.get('MODEL_SERVER_ADDRESS')
+        if not address:
+            return None
+        return (
+            address,
+            app.config['MODEL_SERVER_AUTHKEY'].encode(),
+            app.config.get('MODEL_SERVER_CONNECT_TIMEOUT', 30)
+        )
+
+    @staticmethod
+    def create_batch(user_id: int, title: str, images: List, profile: str = None) -> Work:
+        """
+        Create the Work, one pending OCRResult and one TextBlock per page
+        (flushed, not committed). images must be in page order.
+        """
+        work = Work(user_id=user_id, title=title)
+        db.session.add(work)
+        db.session.flush()  # Get work.id
+
+        for page, image in enumerate(images):
+            ocr_result = OCRResult(
+                image_id=image.id,
+                user_id=user_id,
+                engine='easyocr',
+                language='vi,en',
+                profile=profile,
+                status='pending'
+            )
+            db.session.add(ocr_result)
+            db.session.flush()  # Get ocr_result.id
+
+            if work.ocr_result_id is None:
+                work.ocr_result_id = ocr_result.id
+
+            db.session.add(TextBlock(
+                work_id=work.id,
+                source_type='ocr',
+                title=f'Page {page + 1}: {image.file_name}',
+                content='',
+                extra_data={'ocr_result_id': ocr_result.id, 'image_id': image.id, 'page': page + 1},
+                position=page
+            ))
+
+        return work
+
+    @classmethod
+    def _reset_pool(cls, pool: ProcessPoolExecutor) -> None:
+        """Drop a broken pool (a worker died, e.g. OOM-killed); the next batch starts a new one"""
+        with cls._lock:
+            if cls._pool is not pool:
+                return
+            cls._pool = None
+        print("[OCR] Batch pool broken, it will be restarted")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def start(cls, app, work_id: int) -> None:
+        """Process a committed batch in the background"""
+        threading.Thread(
+            target=cls._run,
+            args=(app, work_id),
+            name=f'ocr-batch-{work_id}',
+            daemon=True
+        ).start()
+
+    @staticmethod
+    def _pages(work_id: int) -> List:
+        return TextBlock.query.filter_by(work_id=work_id, source_type='ocr')\
+            .order_by(TextBlock.position).all()
+
+    @classmethod
+    def _run(cls, app, work_id: int) -> None:
+        with app.app_context():
+            start_time = time.time()
+            pool = None
+            page_ids = []
+
+            try:
+                page_ids = [block.extra_data['ocr_result_id'] for block in cls._pages(work_id)]
+                OCRJobService.track(app, page_ids)
+                pool = cls._get_pool(app)
+                cls._process_pages(pool, work_id)
+            except Exception as e:
+                # submit / fingerprint / DB errors: no page may stay unfinished
+                db.session.rollback()
+                if isinstance(e, BrokenProcessPool) and pool is not None:
+                    cls._reset_pool(pool)
+                failed = cls._fail_unfinished(work_id, str(e) or type(e).__name__)
+                print(f"[OCR] Batch {work_id} aborted ({failed} pages failed): {e}")
+            finally:
+                OCRJobService.untrack(page_ids)
+
+            print(f"[OCR] Batch {work_id} finished in {time.time() - start_time:.1f}s")
+
+    @classmethod
+    def _process_pages(cls, pool: ProcessPoolExecutor, work_id: int) -> None:
+        futures = {}
+
+        for block in cls._pages(work_id):
+            ocr_result = db.session.get(OCRResult, block.extra_data['ocr_result_id'])
+            fingerprint = OCRService.pipeline_fingerprint(ocr_result.profile)
+            if OCRCacheService.reuse(ocr_result, fingerprint) is not None:
+                block.content = ocr_result.processed_text or ''
+                continue
+
+            ocr_result.status = 'processing'
+            future = pool.submit(_ocr_page, ocr_result.image.file_path, ocr_result.profile)
+            futures[future] = block.id
+        db.session.commit()
+
+        total = len(futures)
+        for done, future in enumerate(as_completed(futures), start=1):
+            block = db.session.get(TextBlock, futures[future])
+            ocr_result = db.session.get(OCRResult, block.extra_data['ocr_result_id'])
+
+            try:
+                page = future.result()
+                raw_text = OCRService.segments_to_text(page['segments'])
+                OCRResultService.complete(
+                    ocr_result, page['segments'], raw_text, raw_text, page['processing_time_ms'],
+                    pipeline_fingerprint=OCRService.pipeline_fingerprint(ocr_result.profile),
+                    preprocess_plan=page['preprocess_plan'],
+                    profile=page['profile']
+                )
+                block.content = raw_text
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                if isinstance(e, BrokenProcessPool):
+                    cls._reset_pool(pool)
+                ocr_result.status = 'failed'
+                ocr_result.error_message = str(e) or type(e).__name__
+                db.session.commit()
+
+            print(f"[OCR] Batch {work_id}: page {block.position + 1} {ocr_result.status} ({done}/{total})")
+
+    @classmethod
+    def _fail_unfinished(cls, work_id: int, message: str) -> int:
+        """Mark the pages of a batch still pending / processing as failed (committed)"""
+        failed = 0
+        for block in cls._pages(work_id):
+            ocr_result = db.session.get(OCRResult, block.extra_data['ocr_result_id'])
+            if ocr_result.status in ('pending', 'processing'):
+                ocr_result.status = 'failed'
+                ocr_result.error_message = message
+                failed += 1
+        db.session.commit()
+        return failed
+
+    @classmethod
+    def progress(cls, work: Work) -> dict:
+        """Per-page status, page timings and total wall time of a batch"""
+        pages = []
+        finished_at = None
+
+        for block in cls._pages(work.id):
+            ocr_result = db.session.get(OCRResult, block.extra_data['ocr_result_id'])
+            pages.append({
+                'page': block.position + 1,
+                'title': block.title,
+                'ocr_result_id': ocr_result.id,
+                'image_id': ocr_result.image_id,
+                'status': ocr_result.status,
+                'processing_time_ms': ocr_result.processing_time_ms,
+                'error': ocr_result.error_message
+            })
+            if ocr_result.status in ('completed', 'failed'):
+                if finished_at is None or ocr_result.updated_at > finished_at:
+                    finished_at = ocr_result.updated_at
+
+        done = sum(1 for p in pages if p['status'] in ('completed', 'failed'))
+        is_finished = done == len(pages)
+        wall_time_ms = None
+        if is_finished and finished_at is not None:
+            wall_time_ms = int((finished_at - work.created_at).total_seconds() * 1000)
+
+        return {
+            'work_id': work.id,
+            'total_pages': len(pages),
+            'done_pages': done,
+            'completed_pages': sum(1 for p in pages if p['status'] == 'completed'),
+            'finished': is_finished,
+            'wall_time_ms': wall_time_ms,
+            'pages': pages
+        }
@@ -0,0 +1,170 @@
+"""OCR Cache Service for reusing OCR results of identical uploads"""
+import threading
+from typing import Optional
+from flask import current_app
+from app import db
+from app.models import Image, OCRResult, OCRSegment
+from app.services.near_duplicate_service import NearDuplicateService
+
+
+class OCRCacheService:
+    """
+    Reuse of completed OCR results keyed by image checksum + pipeline fingerprint.
+
+    The fingerprint includes PIPELINE_VERSION, so bumping the version makes
+    every older result a miss without touching the stored rows.
+    """
+
+    _lock = threading.Lock()
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def find_cached(user_id: int, checksum: str, fingerprint: str) -> Optional[OCRResult]:
+        """
+        Find the latest completed OCR result for the same image bytes
+        produced by the same pipeline, among the user's own uploads
+        (hits are reported to the client: no probing other users' files).
+
+        Args:
+            user_id: ID of the uploading user
+            checksum: SHA256 of the uploaded bytes (Image.checksum)
+            fingerprint: OCRService.pipeline_fingerprint() of the request
+
+        Returns:
+            OCRResult instance if found, None otherwise
+        """
+        cached = OCRResult.query.join(Image, OCRResult.image_id == Image.id).filter(
+            Image.user_id == user_id,
+            Image.checksum == checksum,
+            OCRResult.pipeline_fingerprint == fingerprint,
+            OCRResult.status == 'completed'
+        ).order_by(OCRResult.id.desc()).first()
+
+        OCRCacheService._record(cached is not None)
+        return cached
+
+    @staticmethod
+    def find_near_duplicate(image: Image, fingerprint: str):
+        """
+        Completed result of a near-duplicate earlier upload of the same user
+        (perceptual hash within OCR_NEAR_DUPLICATE_MAX_DISTANCE bits).
+
+        Returns:
+            (OCRResult, hamming distance) or None
+        """
+        if current_app.config.get('OCR_NEAR_DUPLICATE_MODE', 'offer') == 'off':
+            return None
+        return NearDuplicateService.find_result(
+            image, fingerprint, current_app.config.get('OCR_NEAR_DUPLICATE_MAX_DISTANCE', 12)
+        )
+
+    @staticmethod
+    def reuse(ocr_result: OCRResult, fingerprint: str,
+              near_duplicate: bool = None) -> Optional[OCRResult]:
+        """
+        Complete a pending result from the cache when the user uploaded its
+        image before: same checksum, or - when near_duplicate is set (default:
+        OCR_NEAR_DUPLICATE_MODE == 'auto') - a near-duplicate upload.
+
+        Returns:
+            The cached source OCRResult on a hit, None on a miss
+        """
+        cached = OCRCacheService.find_cached(ocr_result.user_id, ocr_result.image.checksum, fingerprint)
+
+        if cached is None:
+            if near_duplicate is None:
+                near_duplicate = current_app.config.get('OCR_NEAR_DUPLICATE_MODE', 'offer') == 'auto'
+            found = OCRCacheService.find_near_duplicate(ocr_result.image, fingerprint) if near_duplicate else None
+            if found is None:
+                return None
+            cached = found[0]
+
+        OCRCacheService.clone(cached, ocr_result, processing_time_ms=0)
+        return cached
+
+    @staticmethod
+    def clone(source: OCRResult, target: OCRResult, processing_time_ms: int = None) -> OCRResult:
+        """
+        Copy a cached result and its segments into a (flushed) result row
+        of the new upload, and mark it completed.
+
+        Args:
+            source: The cached OCRResult
+            target: The OCRResult of the new upload
+            processing_time_ms: Time spent serving the request (optional)
+
+        Returns:
+            The completed target OCRResult
+        """
+        target.engine = source.engine
+        target.language = source.language
+        target.pipeline_fingerprint = source.pipeline_fingerprint
+        target.preprocess_plan = source.preprocess_plan
+        target.profile = source.profile
+        target.raw_text = source.raw_text
+        target.processed_text = source.processed_text
+        target.corrected_text = source.corrected_text
+        target.confidence_avg = source.confidence_avg
+        target.processing_time_ms = processing_time_ms
+        target.word_count = source.word_count
+        target.status = 'completed'
+        target.error_message = None
+
+        for seg in source.segments.order_by(OCRSegment.position).all():
+            db.session.add(OCRSegment(
+                ocr_result_id=target.id,
+                text=seg.text,
+                confidence=seg.confidence,
+                bbox_x1=seg.bbox_x1,
+                bbox_y1=seg.bbox_y1,
+                bbox_x2=seg.bbox_x2,
+                bbox_y2=seg.bbox_y2,
+                engine=seg.engine,
+                ocr_pass=seg.ocr_pass,
+                position=seg.position
+            ))
+
+        return target
+
+    @staticmethod
+    def segments_of(ocr_result: OCRResult) -> list:
+        """Segments of a stored result in the shape extract_text returns"""
+        segments = []
+        for seg in ocr_result.segments.order_by(OCRSegment.position).all():
+            bbox = []
+            if seg.bbox_x1 is not None:
+                bbox = [
+                    [seg.bbox_x1, seg.bbox_y1],
+                    [seg.bbox_x2, seg.bbox_y1],
+                    [seg.bbox_x2, seg.bbox_y2],
+                    [seg.bbox_x1, seg.bbox_y2]
+                ]
+            segments.append({
+                'text': seg.text,
+                'confidence': float(seg.confidence),
+                'bbox': bbox,
+                'engine': seg.engine,
+                'pass': seg.ocr_pass
+            })
+        return segments
+
+    @classmethod
+    def _record(cls, hit: bool) -> None:
+        with cls._lock:
+            if hit:
+                cls._hits += 1
+            else:
+                cls._misses += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Hit / miss counters of this process"""
+        with cls._lock:
+            total = cls._hits + cls._misses
+            return {
+                'hits': cls._hits,
+                'misses': cls._misses,
+                'lookups': total,
+                'hit_rate': round(cls._hits / total, 4) if total else 0.0
+            }
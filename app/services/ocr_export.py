@@ -0,0 +1,163 @@
+"""
+Build step: TorchScript artifacts for the OCR models
+
+    python -m app.services.ocr_export [--output models/ocr_torchscript] [--check-only]
+
+Traces the CRAFT detector and the VietOCR CNN + transformer encoder,
+saves them under --output, checks on sample pages / crops that the traced
+modules give the same outputs as the eager ones, and only then writes the
+manifest that makes init_ocr_reader load them. The VietOCR decoder is a
+token-by-token Python loop in vietocr.translate and stays eager.
+"""
+import argparse
+import os
+from datetime import datetime
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from easyocr.imgproc import normalizeMeanVariance
+from vietocr.tool.translate import process_input
+
+from app.config import Config
+from app.services.ocr_service import init_ocr_reader, get_ocr_reader, get_vietocr_predictor
+from app.services.ocr_torchscript import (
+    ARTIFACTS, MANIFEST, VietOCREncoder, runtime_versions, set_encoder, write_manifest
+)
+
+
+ATOL = 1e-4
+SAMPLE_TEXTS = ('Xin chào', 'Hà Nội 2024', 'Cộng hòa xã hội chủ nghĩa Việt Nam', '0123456789', 'OCR')
+
+
+def _unwrap(module):
+    """EasyOCR wraps the detector in DataParallel on GPU"""
+    return module.module if isinstance(module, torch.nn.DataParallel) else module
+
+
+def _sample_page(height, width):
+    """Normalized CRAFT input (1, 3, H, W) of a synthetic text page"""
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+    for row, text in enumerate(SAMPLE_TEXTS):
+        cv2.putText(page, text, (20, 60 + row * 70), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    x = normalizeMeanVariance(page)
+    return torch.from_numpy(x).permute(2, 0, 1).unsqueeze(0)
+
+
+def _sample_crops():
+    """Synthetic single-line RGB crops of different widths"""
+    crops = []
+    for text in SAMPLE_TEXTS:
+        (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1.0, 2)
+        crop = np.full((h + 20, w + 20, 3), 255, dtype=np.uint8)
+        cv2.putText(crop, text, (10, h + 8), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+        crops.append(Image.fromarray(crop))
+    return crops
+
+
+def _crop_tensor(predictor, crop):
+    dataset = predictor.config['dataset']
+    return process_input(
+        crop, dataset['image_height'], dataset['image_min_width'], dataset['image_max_width']
+    )
+
+
+def export(directory):
+    reader = get_ocr_reader()
+    predictor = get_vietocr_predictor()
+    device = predictor.config['device']
+    model = predictor.model.eval()
+    os.makedirs(directory, exist_ok=True)
+
+    # artifacts being replaced must not be loaded until they pass the check
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    with torch.no_grad():
+        craft = _unwrap(reader.detector).eval()
+        traced_craft = torch.jit.trace(craft, _sample_page(480, 640).to(device), check_trace=False)
+
+        crop = _crop_tensor(predictor, _sample_crops()[0]).to(device)
+        traced_cnn = torch.jit.trace(model.cnn, crop, check_trace=False)
+        traced_encoder = torch.jit.trace(
+            VietOCREncoder(model.transformer).eval(), model.cnn(crop), check_trace=False
+        )
+
+    traced_craft.save(os.path.join(directory, ARTIFACTS['craft']))
+    traced_cnn.save(os.path.join(directory, ARTIFACTS['vietocr_cnn']))
+    traced_encoder.save(os.path.join(directory, ARTIFACTS['vietocr_encoder']))
+    print(f"[Export] Traced modules saved to {directory}")
+
+
+def check(directory):
+    """Compare eager and traced outputs; True when they match"""
+    reader = get_ocr_reader()
+    predictor = get_vietocr_predictor()
+    device = predictor.config['device']
+    model = predictor.model.eval()
+
+    load = lambda name: torch.jit.load(os.path.join(directory, ARTIFACTS[name]), map_location=device).eval()
+    traced_craft, traced_cnn, traced_encoder = load('craft'), load('vietocr_cnn'), load('vietocr_encoder')
+    ok = True
+
+    with torch.no_grad():
+        for height, width in ((480, 640), (736, 1280)):
+            page = _sample_page(height, width).to(device)
+            diff = (_unwrap(reader.detector)(page)[0] - traced_craft(page)[0]).abs().max().item()
+            ok &= diff <= ATOL
+            print(f"[Check] CRAFT {width}x{height}: max diff {diff:.2e}")
+
+        for crop in _sample_crops():
+            x = _crop_tensor(predictor, crop).to(device)
+            src = model.cnn(x)
+            cnn_diff = (src - traced_cnn(x)).abs().max().item()
+            enc_diff = (model.transformer.forward_encoder(src) - traced_encoder(src)).abs().max().item()
+            ok &= cnn_diff <= ATOL and enc_diff <= ATOL
+            print(f"[Check] VietOCR width {x.shape[-1]}: cnn {cnn_diff:.2e}, encoder {enc_diff:.2e}")
+
+    # end to end: same text with the traced modules swapped in
+    crops = _sample_crops()
+    eager_texts = [predictor.predict(crop) for crop in crops]
+    eager_cnn = model.cnn
+    model.cnn = traced_cnn
+    set_encoder(model.transformer, traced_encoder)
+    try:
+        traced_texts = [predictor.predict(crop) for crop in crops]
+    finally:
+        model.cnn = eager_cnn
+        set_encoder(model.transformer, None)
+
+    for eager_text, traced_text in zip(eager_texts, traced_texts):
+        same = eager_text == traced_text
+        ok &= same
+        print(f"[Check] '{eager_text}' -> '{traced_text}' {'OK' if same else 'MISMATCH'}")
+
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export OCR models to TorchScript")
+    parser.add_argument('--output', default=Config.OCR_TORCHSCRIPT_DIR)
+    parser.add_argument('--check-only', action='store_true', help="re-run the consistency check")
+    args = parser.parse_args()
+
+    # eager models only: the export must not load previous artifacts
+    init_ocr_reader(Config.OCR_LANGUAGES)
+
+    if not args.check_only:
+        export(args.output)
+
+    if not check(args.output):
+        raise SystemExit("[Export] Traced outputs differ from eager ones, manifest not written")
+
+    write_manifest(args.output, {
+        'versions': runtime_versions(),
+        'built_at': datetime.utcnow().isoformat()
+    })
+    print(f"[Export] Consistency check passed, manifest written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
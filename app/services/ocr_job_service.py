@@ -0,0 +1,234 @@
+"""OCR Job Service: background OCR processing with status polling"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Optional
+from sqlalchemy import update
+from app import db
+from app.models import OCRResult
+from app.services.ocr_service import OCRService
+from app.services.image_context import ImageContext
+from app.services.ocr_result_service import OCRResultService
+from app.services.ocr_cache_service import OCRCacheService
+
+
+FINAL_STATUSES = ('completed', 'failed')
+
+
+class OCRJobService:
+    """
+    Bounded in-process worker pool for OCR jobs.
+
+    A job is an OCRResult row: it is created as 'pending' by the submit
+    endpoint, switched to 'processing' by a worker and finished as
+    'completed' or 'failed'. The status lives in the database, so any web
+    worker can answer a poll; waiters in the same process are also woken
+    directly when the job finishes.
+
+    The queue itself is in memory. While a process holds unfinished rows
+    (queued jobs, batch pages, SSE streams) it refreshes their updated_at
+    every OCR_JOB_HEARTBEAT_SECONDS; rows whose heartbeat stopped for
+    OCR_JOB_STALE_SECONDS belong to a process that is gone and are failed
+    by fail_interrupted, never the live rows of a sibling process.
+    """
+
+    _lock = threading.Lock()
+    _executor: Optional[ThreadPoolExecutor] = None
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _events = {}
+    _active = set()  # ids of the unfinished rows this process works on
+    _heartbeat_pid = None
+
+    @classmethod
+    def _ensure_started(cls, app) -> None:
+        if cls._executor is not None:
+            return
+
+        with cls._lock:
+            if cls._executor is not None:
+                return
+
+            workers = app.config.get('OCR_JOB_WORKERS', 2)
+            queue_size = app.config.get('OCR_JOB_QUEUE_SIZE', 32)
+
+            cls._slots = threading.BoundedSemaphore(workers + queue_size)
+            cls._executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix='ocr-job'
+            )
+            print(f"[OCR] Job pool started: {workers} workers, queue {queue_size}")
+
+    @classmethod
+    def reserve_slot(cls, app) -> bool:
+        """Reserve room for one job; False when the queue is full"""
+        cls._ensure_started(app)
+        return cls._slots.acquire(blocking=False)
+
+    @classmethod
+    def release_slot(cls) -> None:
+        """Give back a slot reserved for a job that was never submitted"""
+        cls._slots.release()
+
+    @classmethod
+    def submit(cls, app, ocr_result_id: int, run=None) -> None:
+        """
+        Queue a committed pending OCRResult (slot must be reserved).
+
+        Args:
+            app: Flask application, used to push an app context in the worker
+            ocr_result_id: ID of the pending OCRResult
+            run: Optional callable(ocr_result) doing the work instead of
+                 the default single image pipeline
+        """
+        cls._events[ocr_result_id] = threading.Event()
+        cls.track(app, [ocr_result_id])
+        cls._executor.submit(cls._run, app, ocr_result_id, run or cls._process)
+
+    @classmethod
+    def track(cls, app, ocr_result_ids: Iterable[int]) -> None:
+        """Keep the heartbeat of committed unfinished rows until untrack()"""
+        with cls._lock:
+            cls._active.update(ocr_result_ids)
+            # first use in this process (or in a child forked after it)
+            if cls._heartbeat_pid != os.getpid():
+                cls._heartbeat_pid = os.getpid()
+                threading.Thread(
+                    target=cls._heartbeat, args=(app,), name='ocr-heartbeat', daemon=True
+                ).start()
+
+    @classmethod
+    def untrack(cls, ocr_result_ids: Iterable[int]) -> None:
+        with cls._lock:
+            cls._active.difference_update(ocr_result_ids)
+
+    @classmethod
+    def _heartbeat(cls, app) -> None:
+        interval = app.config.get('OCR_JOB_HEARTBEAT_SECONDS', 30)
+        stale = app.config.get('OCR_JOB_STALE_SECONDS', 120)
+
+        while True:
+            time.sleep(interval)
+            with cls._lock:
+                ids = list(cls._active)
+
+            try:
+                with app.app_context():
+                    if ids:
+                        with db.engine.begin() as conn:
+                            conn.execute(update(OCRResult).where(
+                                OCRResult.id.in_(ids),
+                                OCRResult.status.in_(('pending', 'processing'))
+                            ).values(updated_at=datetime.utcnow()))
+                    # reap the rows of processes that died since the last boot
+                    if app.config.get('OCR_JOB_FAIL_INTERRUPTED', True):
+                        cls.fail_interrupted(datetime.utcnow() - timedelta(seconds=stale))
+            except Exception as e:
+                print(f"[OCR] Job heartbeat failed: {e}")
+
+    @classmethod
+    def _run(cls, app, ocr_result_id: int, run) -> None:
+        try:
+            with app.app_context():
+                ocr_result = db.session.get(OCRResult, ocr_result_id)
+                if ocr_result is None or ocr_result.status != 'pending':
+                    return
+
+                ocr_result.status = 'processing'
+                db.session.commit()
+
+                try:
+                    run(ocr_result)
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    ocr_result = db.session.get(OCRResult, ocr_result_id)
+                    ocr_result.status = 'failed'
+                    ocr_result.error_message = str(e)
+                    db.session.commit()
+                    print(f"[OCR] Job {ocr_result_id} failed: {e}")
+        finally:
+            cls._slots.release()
+            cls.untrack([ocr_result_id])
+            event = cls._events.pop(ocr_result_id, None)
+            if event is not None:
+                event.set()
+
+    @staticmethod
+    def _process(ocr_result: OCRResult) -> None:
+        """Default job: OCR the stored image and create its work"""
+        start_time = time.time()
+        image = ocr_result.image
+        fingerprint = OCRService.pipeline_fingerprint(ocr_result.profile)
+
+        if OCRCacheService.reuse(ocr_result, fingerprint) is None:
+            with open(image.file_path, 'rb') as f:
+                image_bytes = f.read()
+
+            ctx = ImageContext.from_bytes(image_bytes)
+            segments = OCRService.extract_text(ctx, profile=ocr_result.profile)
+            raw_text = OCRService.segments_to_text(segments)
+            processing_time_ms = int((time.time() - start_time) * 1000)
+
+            OCRResultService.complete(
+                ocr_result, segments, raw_text, raw_text, processing_time_ms,
+                pipeline_fingerprint=fingerprint,
+                preprocess_plan=ctx.preprocess_plan,
+                profile=ctx.profile
+            )
+
+        OCRResultService.create_work(ocr_result, image.file_name, ocr_result.processed_text or '')
+
+    @staticmethod
+    def fail_interrupted(stale_before: datetime) -> int:
+        """
+        Mark 'pending' / 'processing' rows without a heartbeat since
+        stale_before as failed (committed): the process that held them in
+        its in-memory queue is gone, nothing will ever pick them up.
+
+        Args:
+            stale_before: UTC time; rows last updated before it are failed
+
+        Returns:
+            Number of jobs marked failed
+        """
+        count = OCRResult.query.filter(
+            OCRResult.status.in_(('pending', 'processing')),
+            OCRResult.updated_at < stale_before
+        ).update({
+            'status': 'failed',
+            'error_message': 'Interrupted by a server restart, please submit again',
+            'updated_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+
+        if count:
+            print(f"[OCR] Marked {count} interrupted jobs as failed")
+        return count
+
+    @classmethod
+    def wait(cls, ocr_result_id: int, timeout: float,
+             poll_interval: float = 0.5) -> Optional[OCRResult]:
+        """
+        Long-poll a job until it reaches a final status or timeout expires.
+
+        Returns:
+            The OCRResult as last read from the database, None if missing
+        """
+        deadline = time.monotonic() + max(timeout, 0)
+
+        while True:
+            # end the current transaction so the next read sees fresh rows
+            db.session.rollback()
+            ocr_result = db.session.get(OCRResult, ocr_result_id)
+
+            remaining = deadline - time.monotonic()
+            if ocr_result is None or ocr_result.status in FINAL_STATUSES or remaining <= 0:
+                return ocr_result
+
+            event = cls._events.get(ocr_result_id)
+            if event is not None:
+                event.wait(min(remaining, poll_interval))
+            else:
+                time.sleep(min(remaining, poll_interval))
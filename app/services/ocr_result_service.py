@@ -0,0 +1,352 @@
+"""OCR Result Service for persisting uploads, OCR results and their works"""
+import os
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, List, Optional
+from app import db
+from app.models import Image, OCRResult, OCRSegment, Work, TextBlock
+from app.services.image_context import ImageContext
+from app.services.image_hash import phash_bytes, phash_file
+from app.services.ocr_service import OCRService
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class OCRResultService:
+    """Service shared by the synchronous and the queued OCR endpoints"""
+
+    PAGE_CACHE_SIZE = 4  # decoded pages kept for repeated region re-OCR
+
+    _page_lock = threading.Lock()
+    _pages = OrderedDict()  # (image id, checksum) -> ImageContext
+
+    @classmethod
+    def load_page(cls, image: Image) -> ImageContext:
+        """
+        Decoded original of an uploaded image
+        The last PAGE_CACHE_SIZE pages are kept in memory: a user fixing
+        lines of a page sends several region requests for the same image.
+        """
+        key = (image.id, image.checksum)
+        with cls._page_lock:
+            ctx = cls._pages.get(key)
+            if ctx is not None:
+                cls._pages.move_to_end(key)
+                return ctx
+
+        with open(image.file_path, 'rb') as f:
+            ctx = ImageContext.from_bytes(f.read())
+
+        with cls._page_lock:
+            cls._pages[key] = ctx
+            while len(cls._pages) > cls.PAGE_CACHE_SIZE:
+                cls._pages.popitem(last=False)
+        return ctx
+
+    @staticmethod
+    def save_upload(user_id: int, filename: str, image_bytes: bytes,
+                    upload_folder: str, mime_type: str = None,
+                    source: str = 'upload') -> Image:
+        """
+        Write the upload to disk and add its Image row (flushed, not committed).
+
+        Args:
+            user_id: ID of the uploading user
+            filename: Sanitized original file name
+            image_bytes: Raw upload bytes
+            upload_folder: Folder the file is written to
+            mime_type: MIME type reported by the client (optional)
+            source: upload, url, camera
+
+        Returns:
+            The flushed Image instance
+        """
+        file_path = OCRResultService._unique_path(user_id, filename, upload_folder)
+
+        with open(file_path, 'wb') as f:
+            f.write(image_bytes)
+
+        return OCRResultService._add_image(
+            user_id, filename, file_path, len(image_bytes),
+            hashlib.sha256(image_bytes).hexdigest(), phash_bytes(image_bytes), mime_type, source
+        )
+
+    @staticmethod
+    def save_upload_stream(user_id: int, filename: str, stream: BinaryIO,
+                           upload_folder: str, max_size: int,
+                           mime_type: str = None, source: str = 'upload') -> Image:
+        """
+        Stream an upload to disk in chunks and add its Image row (flushed).
+        The checksum is computed while writing, the file is never held in memory.
+
+        Raises:
+            ValueError: if the stream is larger than max_size bytes
+        """
+        file_path = OCRResultService._unique_path(user_id, filename, upload_folder)
+        sha256 = hashlib.sha256()
+        size = 0
+
+        try:
+            with open(file_path, 'wb') as f:
+                for chunk in iter(lambda: stream.read(STREAM_CHUNK_SIZE), b''):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError(f'{filename}: file too large. Max size: {max_size // (1024*1024)}MB')
+                    sha256.update(chunk)
+                    f.write(chunk)
+        except Exception:
+            os.remove(file_path)
+            raise
+
+        return OCRResultService._add_image(
+            user_id, filename, file_path, size, sha256.hexdigest(), phash_file(file_path), mime_type, source
+        )
+
+    @staticmethod
+    def _unique_path(user_id: int, filename: str, upload_folder: str) -> str:
+        os.makedirs(upload_folder, exist_ok=True)
+
+        # Generate unique filename
+        unique_filename = f"{user_id}_{time.time_ns()}_{filename}"
+        return os.path.join(upload_folder, unique_filename)
+
+    @staticmethod
+    def _add_image(user_id, filename, file_path, file_size, checksum, phash, mime_type, source) -> Image:
+        image = Image(
+            user_id=user_id,
+            file_name=filename,
+            file_path=file_path,
+            file_size=file_size,
+            mime_type=mime_type,
+            source=source,
+            checksum=checksum,
+            phash=phash
+        )
+        db.session.add(image)
+        db.session.flush()  # Get image.id
+
+        return image
+
+    @staticmethod
+    def create_pending(image: Image, profile: str = None) -> OCRResult:
+        """Add a pending OCRResult for an image (flushed, not committed)"""
+        ocr_result = OCRResult(
+            image_id=image.id,
+            user_id=image.user_id,
+            engine='easyocr',
+            language='vi,en',
+            profile=profile,
+            status='pending'
+        )
+        db.session.add(ocr_result)
+        db.session.flush()  # Get ocr_result.id
+
+        return ocr_result
+
+    @staticmethod
+    def complete(ocr_result: OCRResult, segments: List[dict], raw_text: str,
+                 processed_text: str, processing_time_ms: int,
+                 pipeline_fingerprint: str = None,
+                 preprocess_plan: str = None,
+                 profile: str = None) -> OCRResult:
+        """
+        Fill an OCRResult with the pipeline output and add its segments.
+
+        Args:
+            ocr_result: The (flushed) result row to complete
+            segments: Segments as returned by OCRService.extract_text
+            raw_text: Text joined from the segments
+            processed_text: Text after post-processing
+            processing_time_ms: Wall time of the OCR run
+            pipeline_fingerprint: Fingerprint of the pipeline that produced it
+            preprocess_plan: Preprocessing plan chosen for the image
+            profile: OCR profile that produced the result
+
+        Returns:
+            The completed OCRResult
+        """
+        # Calculate average confidence
+        confidence_avg = None
+        if segments:
+            confidences = [seg.get('confidence', 0) for seg in segments if 'confidence' in seg]
+            if confidences:
+                confidence_avg = sum(confidences) / len(confidences)
+
+        ocr_result.pipeline_fingerprint = pipeline_fingerprint
+        ocr_result.preprocess_plan = preprocess_plan
+        ocr_result.profile = profile
+        ocr_result.raw_text = raw_text
+        ocr_result.processed_text = processed_text
+        ocr_result.corrected_text = raw_text
+        ocr_result.confidence_avg = confidence_avg
+        ocr_result.processing_time_ms = processing_time_ms
+        ocr_result.word_count = len(processed_text.split()) if processed_text else 0
+        ocr_result.status = 'completed'
+        ocr_result.error_message = None
+
+        for idx, seg in enumerate(segments):
+            bbox = seg.get('bbox', [])
+            db.session.add(OCRSegment(
+                ocr_result_id=ocr_result.id,
+                text=seg.get('text', ''),
+                confidence=seg.get('confidence', 0),
+                bbox_x1=int(bbox[0][0]) if len(bbox) > 0 else None,
+                bbox_y1=int(bbox[0][1]) if len(bbox) > 0 else None,
+                bbox_x2=int(bbox[2][0]) if len(bbox) > 2 else None,
+                bbox_y2=int(bbox[2][1]) if len(bbox) > 2 else None,
+                engine=seg.get('engine'),
+                ocr_pass=seg.get('pass'),
+                position=idx
+            ))
+
+        return ocr_result
+
+    @staticmethod
+    def reocr_regions(ocr_result: OCRResult, ctx: ImageContext, regions: List[list],
+                      profile: str = None) -> List[OCRSegment]:
+        """
+        Re-run recognition inside rectangles of a completed result and
+        update its segments in place (not committed).
+
+        Stored segments whose center lies in a region are recognized again
+        on their stored boxes (no detection); a region without any stored
+        segment gets detection inside it and its lines are added as new
+        segments, in reading order. A segment covered by several regions is
+        recognized once, with the first of them. Text, confidence and word
+        count of the result are recomputed from the updated segments, and
+        its pipeline fingerprint is cleared: an edited result no longer
+        matches what the pipeline gives for the image and is never reused.
+
+        Args:
+            ocr_result: The completed OCRResult to update
+            ctx: Decoded original image of the result
+            regions: [x1, y1, x2, y2] rectangles in original image coordinates
+            profile: OCR profile for recognition (default: the result's)
+
+        Returns:
+            The updated and added OCRSegment rows
+        """
+        segments = ocr_result.segments.order_by(OCRSegment.position).all()
+        changed = []
+        added = []
+        done = set()  # ids of segments already recognized by an earlier region
+
+        for x1, y1, x2, y2 in regions:
+            inside = [
+                seg for seg in segments
+                if seg.bbox_x1 is not None
+                and x1 <= (seg.bbox_x1 + seg.bbox_x2) / 2 <= x2
+                and y1 <= (seg.bbox_y1 + seg.bbox_y2) / 2 <= y2
+            ]
+            matched = [seg for seg in inside if seg.id not in done]
+            if inside and not matched:
+                continue
+            done.update(seg.id for seg in matched)
+
+            # cut the region grown to cover its lines plus the retry padding
+            if matched:
+                pad = int(math.ceil(max(seg.bbox_y2 - seg.bbox_y1 for seg in matched)
+                                    * OCRService.RETRY_PADDING))
+                x1 = min([x1] + [seg.bbox_x1 for seg in matched]) - pad
+                y1 = min([y1] + [seg.bbox_y1 for seg in matched]) - pad
+                x2 = max([x2] + [seg.bbox_x2 for seg in matched]) + pad
+                y2 = max([y2] + [seg.bbox_y2 for seg in matched]) + pad
+            x1, y1 = max(int(x1), 0), max(int(y1), 0)
+            x2, y2 = min(int(x2), ctx.width), min(int(y2), ctx.height)
+            if x2 <= x1 or y2 <= y1:
+                continue
+
+            boxes = [
+                [[seg.bbox_x1 - x1, seg.bbox_y1 - y1], [seg.bbox_x2 - x1, seg.bbox_y1 - y1],
+                 [seg.bbox_x2 - x1, seg.bbox_y2 - y1], [seg.bbox_x1 - x1, seg.bbox_y2 - y1]]
+                for seg in matched
+            ]
+            recognized = OCRService.recognize_region(
+                ctx.original[y1:y2, x1:x2], boxes=boxes, profile=profile or ocr_result.profile
+            )
+
+            if matched:
+                # recognize_region keeps the box order, skipping empty crops
+                by_box = {tuple(map(tuple, r['bbox'])): r for r in recognized}
+                for seg, box in zip(matched, boxes):
+                    result = by_box.get(tuple(map(tuple, box)))
+                    if result is None:
+                        continue
+                    seg.text = result['text']
+                    seg.confidence = result['confidence']
+                    seg.engine = result['engine']
+                    seg.ocr_pass = result['pass']
+                    changed.append(seg)
+                continue
+
+            for result in recognized:
+                xs = [p[0] + x1 for p in result['bbox']]
+                ys = [p[1] + y1 for p in result['bbox']]
+                seg = OCRSegment(
+                    ocr_result_id=ocr_result.id,
+                    text=result['text'],
+                    confidence=result['confidence'],
+                    bbox_x1=int(min(xs)),
+                    bbox_y1=int(min(ys)),
+                    bbox_x2=int(max(xs)),
+                    bbox_y2=int(max(ys)),
+                    engine=result['engine'],
+                    ocr_pass=result['pass']
+                )
+                db.session.add(seg)
+                added.append(seg)
+
+        # new lines go before the first stored line that starts below them
+        for seg in sorted(added, key=lambda s: s.bbox_y1):
+            center = (seg.bbox_y1 + seg.bbox_y2) / 2
+            index = next(
+                (i for i, other in enumerate(segments)
+                 if other.bbox_x1 is not None and other.bbox_y1 > center),
+                len(segments)
+            )
+            segments.insert(index, seg)
+        for position, seg in enumerate(segments):
+            seg.position = position
+
+        raw_text = OCRService.segments_to_text([{'text': seg.text} for seg in segments])
+        confidences = [float(seg.confidence) for seg in segments]
+        ocr_result.raw_text = raw_text
+        ocr_result.processed_text = raw_text
+        ocr_result.corrected_text = raw_text
+        ocr_result.confidence_avg = sum(confidences) / len(confidences) if confidences else None
+        ocr_result.word_count = len(raw_text.split()) if raw_text else 0
+        ocr_result.pipeline_fingerprint = None
+
+        return changed + added
+
+    @staticmethod
+    def create_work(ocr_result: OCRResult, title: str, content: str) -> Work:
+        """Create a Work with the OCR text as its first block (flushed)"""
+        work = Work(
+            user_id=ocr_result.user_id,
+            title=title,
+            ocr_result_id=ocr_result.id
+        )
+        db.session.add(work)
+        db.session.flush()  # Get work.id
+
+        # Create initial text block with OCR result
+        db.session.add(TextBlock(
+            work_id=work.id,
+            source_type='ocr',
+            title='OCR Result',
+            content=content,
+            position=0
+        ))
+
+        return work
+
+    @staticmethod
+    def find_work_id(ocr_result: OCRResult) -> Optional[int]:
+        """ID of the work created from an OCR result, if any"""
+        work = ocr_result.works.first()
+        return work.id if work else None
@@ -1,34 +1,199 @@
 import easyocr
 import cv2
 import numpy as np
-from PIL import Image
 from vietocr.tool.predictor import Predictor
 from vietocr.tool.config import Cfg
 import torch
+import hashlib
+import json
+import math
+import re
+from importlib import metadata
+from app.services.vietocr_batch import BatchPredictor
+from app.services.vietocr_scheduler import MicroBatchScheduler
+from app.services.model_client import connect_model_server, get_model_client
+from app.services.ocr_torchscript import load_torchscript_models
+from app.services.disk_cache import DiskLRUCache
+from app.services.image_context import ImageContext
+
+# Bump whenever a change to the pipeline can change its output:
+# stored results with an older version are no longer reused.
+PIPELINE_VERSION = 7
+
+# Speed / quality profiles, selectable per request (profile=...) and per
+# deployment (OCR_DEFAULT_PROFILE)
+# - canvas_size / mag_ratio: EasyOCR (CRAFT) detection input size
+# - preprocess: 'auto' or one of OCRService.PREPROCESS_PLANS
+# - recognizer: 'vietocr' (EasyOCR detection + VietOCR), 'easyocr', or
+#   'two_pass' (EasyOCR recognizes first, VietOCR only the hard lines)
+# - max_pixels: downscale budget for the detection image (None = no limit)
+# - tile_size: detection images with a longer side are split into
+#   overlapping tiles instead of being shrunk to canvas_size (None = never)
+OCR_PROFILES = {
+    'fast': {
+        'canvas_size': 1280,
+        'mag_ratio': 1.0,
+        'preprocess': 'none',
+        'recognizer': 'easyocr',
+        'max_pixels': 2_000_000,
+        'tile_size': None,
+    },
+    'balanced': {
+        'canvas_size': 2560,
+        'mag_ratio': 1.0,
+        'preprocess': 'auto',
+        'recognizer': 'two_pass',
+        'max_pixels': 5_000_000,
+        'tile_size': 3200,
+    },
+    'accurate': {
+        'canvas_size': 3200,
+        'mag_ratio': 1.5,
+        'preprocess': 'nlm',
+        'recognizer': 'vietocr',
+        'max_pixels': None,
+        'tile_size': 2560,
+    },
+}
 
 _ocr_reader = None
+_ocr_languages = None
+_default_profile = 'balanced'
 _vietocr_predictor = None
+_vietocr_batch_predictor = None
+_vietocr_ready = False
+_quantized = False
+_torchscript = False
+_precision = 'fp32'  # what VietOCR actually runs: fp32, int8, int8-decoder
+_recognition_cache = None
 
 
-def init_ocr_reader(languages):
+def init_ocr_reader(languages, vietocr_batch_size=32, vietocr_bucket_width=32,
+                    default_profile='balanced', vietocr_batch_window_ms=0,
+                    vietocr_scheduler_batch_size=64, quantize=False, torch_threads=0,
+                    torchscript_dir=None, recognition_cache_size=0,
+                    recognition_cache_path=None):
     """
     Initialize OCR readers once at app startup
+    vietocr_batch_window_ms > 0 puts a cross-request micro-batching
+    scheduler in front of the VietOCR batch predictor
+    quantize: int8 dynamic quantization of VietOCR (CPU only)
+    torch_threads: intra-op thread count (0 = PyTorch default)
+    torchscript_dir: traced CRAFT / VietOCR encoder built by
+    app.services.ocr_export, used instead of the eager modules when present
+    recognition_cache_size > 0 memoizes VietOCR per crop hash (LRU of that
+    many entries, backed by the sqlite file recognition_cache_path)
     """
-    global _ocr_reader, _vietocr_predictor
+    global _ocr_reader, _ocr_languages, _vietocr_predictor, _vietocr_batch_predictor, \
+        _default_profile, _vietocr_ready, _recognition_cache, _torchscript
+
+    if default_profile not in OCR_PROFILES:
+        raise ValueError(f"Unknown OCR profile: {default_profile}")
+    _default_profile = default_profile
+
+    if torch_threads:
+        torch.set_num_threads(torch_threads)
+
     GPU = torch.cuda.is_available()
-    print(f"[OCR] GPU Available: {GPU}")
+    print(f"[OCR] GPU Available: {GPU}, threads: {torch.get_num_threads()}")
     
     if _ocr_reader is None:
         _ocr_reader = easyocr.Reader(languages, gpu=GPU)
+        _ocr_languages = list(languages)
 
     if _vietocr_predictor is None:
         config = Cfg.load_config_from_name("vgg_transformer")
         config["device"] = "cuda" if GPU else "cpu"
         _vietocr_predictor = Predictor(config)
 
+        if torchscript_dir:
+            _torchscript = load_torchscript_models(
+                _ocr_reader, _vietocr_predictor, torchscript_dir, config["device"]
+            )
+
+    # before the batch predictor: the recognition cache is keyed on it
+    if quantize:
+        quantize_ocr_models()
+
+    if _vietocr_batch_predictor is None:
+        if recognition_cache_size:
+            _recognition_cache = DiskLRUCache(recognition_cache_path, max_items=recognition_cache_size)
+
+        _vietocr_batch_predictor = BatchPredictor(
+            _vietocr_predictor,
+            max_batch_size=vietocr_batch_size,
+            bucket_width=vietocr_bucket_width,
+            cache=_recognition_cache,
+            cache_version=_vietocr_model_version()
+        )
+        if vietocr_batch_window_ms > 0:
+            _vietocr_batch_predictor = MicroBatchScheduler(
+                _vietocr_batch_predictor,
+                max_batch_size=vietocr_scheduler_batch_size,
+                window_ms=vietocr_batch_window_ms
+            )
+    _vietocr_ready = True
+
     return _ocr_reader
 
 
+def _vietocr_model_version():
+    """Identifies what VietOCR outputs depend on (recognition cache key)"""
+    return f"vietocr-{metadata.version('vietocr')}-vgg_transformer-{_precision}"
+
+
+def quantize_ocr_models():
+    """
+    Dynamic int8 quantization of the VietOCR model (its Linear layers:
+    transformer feed-forward / output projection), in place
+    The EasyOCR recognizer needs nothing here: easyocr.Reader already
+    quantizes it on CPU (Reader(quantize=True) is the default). Detection
+    (CRAFT, convolutional) stays fp32. CPU only: quantized kernels do not
+    run on CUDA, the call is ignored when models are on GPU.
+    With TorchScript artifacts loaded, the traced CNN / encoder were
+    exported from the fp32 model and are outside the module tree
+    quantize_dynamic walks: only the eager decoder becomes int8
+    (precision 'int8-decoder').
+    """
+    global _quantized, _precision
+
+    if _quantized:
+        return
+    if torch.cuda.is_available():
+        print("[OCR] Quantization skipped: models run on GPU")
+        return
+
+    if _vietocr_predictor is None:
+        return
+
+    _vietocr_predictor.model = torch.ao.quantization.quantize_dynamic(
+        _vietocr_predictor.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    _quantized = True
+    if _torchscript:
+        _precision = 'int8-decoder'
+        print("[OCR] VietOCR decoder quantized to int8; the TorchScript CNN / encoder stay fp32")
+    else:
+        _precision = 'int8'
+        print("[OCR] VietOCR quantized to int8")
+
+
+def use_model_server(address, authkey, timeout=30):
+    """
+    Send OCR to the model server instead of loading the models here
+    The server's languages / default profile are adopted so settings and
+    pipeline fingerprints match what it actually runs.
+    """
+    global _ocr_languages, _default_profile, _vietocr_ready, _quantized, _precision
+
+    info = connect_model_server(address, authkey, timeout)
+    _ocr_languages = list(info['languages'])
+    _default_profile = info['default_profile']
+    _vietocr_ready = info['vietocr']
+    _quantized = info['quantized']
+    _precision = info['precision']
+
+
 def get_ocr_reader():
     """Get EasyOCR singleton"""
     return _ocr_reader
@@ -39,89 +204,753 @@ def get_vietocr_predictor():
     return _vietocr_predictor
 
 
+def get_vietocr_batch_predictor():
+    """Get batched VietOCR singleton (the micro-batching scheduler when enabled)"""
+    return _vietocr_batch_predictor
+
+
+def get_recognition_cache_stats():
+    """Crop-hash recognition cache counters (of the model server when used), None when the cache is off"""
+    client = get_model_client()
+    if client is not None:
+        return client.recognition_cache_stats()
+    return _recognition_cache.stats() if _recognition_cache is not None else None
+
+
+def get_vietocr_scheduler_stats():
+    """Queue depth / batch-size histogram (of the model server when used), None when the scheduler is off"""
+    client = get_model_client()
+    if client is not None:
+        return client.scheduler_stats()
+    if isinstance(_vietocr_batch_predictor, MicroBatchScheduler):
+        return _vietocr_batch_predictor.stats()
+    return None
+
+
 class OCRService:
     """Service for OCR processing"""
 
+    # Preprocessing plans, cheapest first
+    PREPROCESS_PLANS = ('none', 'clahe', 'fast', 'nlm')
+
+    # Noise sigma (gray levels) above which denoising is needed
+    NOISE_FAST_THRESHOLD = 1.5
+    NOISE_NLM_THRESHOLD = 5.0
+    # 1st-99th percentile range below which CLAHE is needed
+    LOW_CONTRAST_RANGE = 120
+
+    _NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
+    # Tiles overlap by tile_size / TILE_OVERLAP_DIVISOR (must exceed a text line)
+    TILE_OVERLAP_DIVISOR = 8
+    # A box mostly inside a bigger one (intersection / own area) is a duplicate
+    DUPLICATE_BOX_RATIO = 0.6
+    # A box is on a text line when its vertical center is within this share
+    # of the smaller of its height and the line's mean height from the
+    # line's mean center
+    LINE_CENTER_RATIO = 0.5
+    # Boxes on one line are merged when the gap is below this many line heights
+    LINE_GAP_RATIO = 1.0
+
+    RECOGNIZERS = ('easyocr', 'vietocr', 'two_pass')
+    # Two-pass: minimum EasyOCR confidence to accept a line without VietOCR
+    PASS1_ACCEPT_NUMERIC = 0.5   # digits / punctuation only
+    PASS1_ACCEPT_ASCII = 0.8     # no diacritics
+    PASS1_ACCEPT_ANY = 0.95      # anything else
+    # VietOCR lines below this confidence are re-cropped and tried again
+    RETRY_CONFIDENCE = 0.6
+    RETRY_PADDING = 0.2          # of the line height, on every side
+    RETRY_STRETCH = (2, 98)      # gray percentiles stretched to 0-255 on retry crops
+
+    _NUMERIC_RE = re.compile(r'^[\d\s.,:;/%()+\-]+$')
+
+    @staticmethod
+    def resolve_settings(profile=None, preprocess=None, use_vietocr=None):
+        """
+        Settings of a profile (default: the deployment's), with the
+        legacy preprocess / use_vietocr arguments applied on top
+        """
+        name = profile or _default_profile
+        if name not in OCR_PROFILES:
+            raise ValueError(f"Unknown OCR profile: {name}")
+
+        settings = dict(OCR_PROFILES[name], name=name)
+
+        if preprocess is not None:
+            settings['preprocess'] = OCRService._plan_param(preprocess)
+        if use_vietocr is not None:
+            settings['recognizer'] = 'vietocr' if use_vietocr else 'easyocr'
+        if settings['recognizer'] not in OCRService.RECOGNIZERS:
+            raise ValueError(f"Unknown recognizer: {settings['recognizer']}")
+        if not _vietocr_ready:
+            settings['recognizer'] = 'easyocr'
+
+        return settings
+
     @staticmethod
-    def preprocess_image(image_bytes):
+    def pipeline_fingerprint(profile=None, preprocess=None, use_vietocr=None):
+        """
+        Hash of the pipeline version and the parameters that affect output
+        Two runs with the same fingerprint on the same bytes give the same result
+        """
+        settings = OCRService.resolve_settings(profile, preprocess, use_vietocr)
+        settings.pop('name')
+
+        params = {
+            "version": PIPELINE_VERSION,
+            "languages": sorted(_ocr_languages or []),
+            "settings": settings,
+            "precision": _precision,
+        }
+        payload = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _plan_param(preprocess):
+        """Normalize the preprocess argument: True -> 'auto', False -> 'none'"""
+        if preprocess is True:
+            return 'auto'
+        if not preprocess:
+            return 'none'
+        if preprocess != 'auto' and preprocess not in OCRService.PREPROCESS_PLANS:
+            raise ValueError(f"Unknown preprocess plan: {preprocess}")
+        return preprocess
+
+    @staticmethod
+    def estimate_quality(gray, grid=6, patch=64):
+        """
+        Cheap noise / contrast estimate of a grayscale image
+
+        Noise: Immerkaer's Laplacian-difference estimator on a grid of
+        patches, using the median so text edges do not count as noise.
+        Contrast: 1st-99th percentile range on a strided sample.
+        Returns (noise_sigma, contrast_range)
+        """
+        h, w = gray.shape
+        ys = np.linspace(0, max(h - patch, 0), grid).astype(int)
+        xs = np.linspace(0, max(w - patch, 0), grid).astype(int)
+
+        responses = []
+        for y in ys:
+            for x in xs:
+                block = gray[y:y + patch, x:x + patch].astype(np.float32)
+                if block.shape[0] < 3 or block.shape[1] < 3:
+                    continue
+                response = cv2.filter2D(block, -1, OCRService._NOISE_KERNEL)
+                responses.append(np.abs(response[1:-1, 1:-1]).ravel())
+
+        noise_sigma = 0.0
+        if responses:
+            # median(|r|) = 0.6745 * 6 * sigma for Gaussian noise
+            noise_sigma = float(np.median(np.concatenate(responses))) / (0.6745 * 6)
+
+        step = max(1, min(h, w) // 256)
+        low, high = np.percentile(gray[::step, ::step], (1, 99))
+
+        return noise_sigma, float(high - low)
+
+    @staticmethod
+    def choose_preprocess_plan(gray):
+        """Pick the cheapest preprocessing plan the image needs"""
+        noise_sigma, contrast_range = OCRService.estimate_quality(gray)
+
+        if noise_sigma >= OCRService.NOISE_NLM_THRESHOLD:
+            return 'nlm'
+        if noise_sigma >= OCRService.NOISE_FAST_THRESHOLD:
+            return 'fast'
+        if contrast_range < OCRService.LOW_CONTRAST_RANGE:
+            return 'clahe'
+        return 'none'
+
+    @staticmethod
+    def preprocess_image(image_bytes, plan='auto'):
         """
         Preprocess image for better OCR accuracy
         """
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        return OCRService.preprocess(ImageContext.from_bytes(image_bytes), plan)
 
-        if img is None:
-            raise ValueError("Cannot decode image")
+    @staticmethod
+    def preprocess(ctx, plan='auto', max_pixels=None):
+        """
+        Preprocess an already decoded image
+        - none: grayscale only (clean screenshots / scans)
+        - clahe: contrast enhancement only
+        - fast: CLAHE + 3x3 median (mild noise)
+        - nlm: CLAHE + non-local means denoising (noisy camera photos)
+        Images above max_pixels are downscaled first.
+        The result and the chosen plan are stored on ctx
+        """
+        processed = ctx.gray
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        if max_pixels and ctx.width * ctx.height > max_pixels:
+            scale = math.sqrt(max_pixels / (ctx.width * ctx.height))
+            processed = cv2.resize(
+                processed,
+                (max(1, int(ctx.width * scale)), max(1, int(ctx.height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
 
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
+        if plan == 'auto':
+            plan = OCRService.choose_preprocess_plan(processed)
 
-        denoised = cv2.fastNlMeansDenoising(enhanced, None, 10, 7, 21)
+        if plan != 'none':
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            processed = clahe.apply(processed)
 
-        h, w = denoised.shape
+        if plan == 'fast':
+            processed = cv2.medianBlur(processed, 3)
+        elif plan == 'nlm':
+            processed = cv2.fastNlMeansDenoising(processed, None, 10, 7, 21)
+
+        h, w = processed.shape
         if w < 300:
             scale = 300 / w
-            denoised = cv2.resize(
-                denoised,
+            processed = cv2.resize(
+                processed,
                 (int(w * scale), int(h * scale)),
                 interpolation=cv2.INTER_CUBIC
             )
 
-        return denoised
+        ctx.preprocess_plan = plan
+        ctx.set_processed(processed)
+        return processed
+
+    @staticmethod
+    def detect_boxes(reader, img, canvas_size=2560, mag_ratio=1.0):
+        """
+        Run EasyOCR (CRAFT) detection only, without its recognizer
+        Boxes are returned as 4 points, in the same order readtext() uses
+        """
+        horizontal_list, free_list = reader.detect(img, canvas_size=canvas_size, mag_ratio=mag_ratio)
+
+        boxes = [
+            [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+            for x_min, x_max, y_min, y_max in horizontal_list[0]
+        ]
+        boxes.extend(
+            [[int(p[0]), int(p[1])] for p in poly] for poly in free_list[0]
+        )
+        return boxes
+
+    @staticmethod
+    def _tile_origins(length, tile_size, overlap):
+        """Start offsets of overlapping tiles covering [0, length)"""
+        if length <= tile_size:
+            return [0]
+        step = tile_size - overlap
+        return list(range(0, length - tile_size, step)) + [length - tile_size]
+
+    @staticmethod
+    def detect_boxes_tiled(reader, img, tile_size=None, canvas_size=2560, mag_ratio=1.0):
+        """
+        Detection on large pages: overlapping tiles of tile_size are detected
+        at their own resolution, boxes are shifted back to image coordinates
+        and duplicates from the overlap zones are merged
+        """
+        h, w = img.shape[:2]
+        if not tile_size or max(h, w) <= tile_size:
+            return OCRService.detect_boxes(reader, img, canvas_size, mag_ratio)
+
+        overlap = tile_size // OCRService.TILE_OVERLAP_DIVISOR
+        boxes = []
+
+        for y0 in OCRService._tile_origins(h, tile_size, overlap):
+            for x0 in OCRService._tile_origins(w, tile_size, overlap):
+                tile = img[y0:y0 + tile_size, x0:x0 + tile_size]
+                detected = OCRService.detect_boxes(
+                    reader, tile, canvas_size=max(canvas_size, tile_size), mag_ratio=mag_ratio
+                )
+                boxes.extend(
+                    [[int(p[0]) + x0, int(p[1]) + y0] for p in bbox] for bbox in detected
+                )
+
+        return OCRService.dedupe_boxes(boxes)
 
     @staticmethod
-    def extract_text(image_bytes, preprocess=True, use_vietocr=True):
+    def dedupe_boxes(boxes):
         """
-        Extract text from image
+        Merge boxes detected twice in tile overlap zones
+        - a box mostly covered by a bigger one is dropped
+        - two pieces of the same line cut by different tile borders
+          (vertical overlap > 50%, touching horizontally) become their union
+        Result is sorted top-to-bottom, left-to-right
+        """
+        if not boxes:
+            return []
+
+        pts = np.array([[[p[0], p[1]] for p in bbox] for bbox in boxes], dtype=np.float64)
+        rects = np.concatenate([pts.min(axis=1), pts.max(axis=1)], axis=1)  # x1, y1, x2, y2
+        areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+
+        kept = []  # [rect, bbox]
+        for i in np.argsort(-areas, kind='stable'):
+            rect = rects[i]
+            if kept:
+                k = np.array([r for r, _ in kept])
+                ix = np.minimum(k[:, 2], rect[2]) - np.maximum(k[:, 0], rect[0])
+                iy = np.minimum(k[:, 3], rect[3]) - np.maximum(k[:, 1], rect[1])
+                inter = np.clip(ix, 0, None) * np.clip(iy, 0, None)
+
+                own_area = max(areas[i], 1.0)
+                contained = inter / own_area > OCRService.DUPLICATE_BOX_RATIO
+                if contained.any():
+                    continue
+
+                heights = np.minimum(k[:, 3] - k[:, 1], rect[3] - rect[1])
+                same_line = (iy > 0.5 * np.maximum(heights, 1.0)) & (ix >= 0)
+                if same_line.any():
+                    j = int(np.argmax(same_line))
+                    union = np.concatenate([np.minimum(k[j, :2], rect[:2]), np.maximum(k[j, 2:], rect[2:])])
+                    x1, y1, x2, y2 = (int(v) for v in union)
+                    kept[j] = [union, [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]]
+                    continue
+
+            kept.append([rect, boxes[i]])
+
+        kept.sort(key=lambda item: (item[0][1], item[0][0]))
+        return [bbox for _, bbox in kept]
+
+    @staticmethod
+    def merge_lines(boxes, max_aspect=None):
+        """
+        Consolidate word-level boxes into line boxes, in reading order
+        - boxes are clustered into lines by vertical center
+        - horizontally adjacent boxes of a line (gap < LINE_GAP_RATIO
+          line heights) are merged into their bounding rectangle
+        - max_aspect (width / height) caps a merged box so the recognizer
+          does not have to squeeze it; wider runs are split
+        Returns 4-point boxes sorted top-to-bottom, left-to-right
+        """
+        if not boxes:
+            return []
+
+        pts = np.array([[[p[0], p[1]] for p in bbox] for bbox in boxes], dtype=np.float64)
+        rects = np.concatenate([pts.min(axis=1), pts.max(axis=1)], axis=1)  # x1, y1, x2, y2
+        heights = np.maximum(rects[:, 3] - rects[:, 1], 1.0)
+
+        # sweep by vertical center: a box joins the current line when its
+        # center is close to the line's running mean center (measured in the
+        # smaller of the two heights, so a tall box cannot pull the next
+        # line in), otherwise it starts a new one. The mean follows skew.
+        # This stays a Python loop on purpose: a vectorized rule can only
+        # compare neighbouring centers (np.diff), and on synthetic pages that
+        # chains adjacent lines together ~10x more often. The loop is O(n)
+        # over a few hundred boxes, negligible next to recognition; the
+        # gap / merge steps below are vectorized per line.
+        centers = (rects[:, 1] + rects[:, 3]) / 2
+        order = np.argsort(centers, kind='stable')
+        line_of = np.empty(len(boxes), dtype=np.int64)
+        line, count = -1, 0
+        center_sum = height_sum = 0.0
+        for i in order:
+            same_line = count and abs(centers[i] - center_sum / count) <= \
+                OCRService.LINE_CENTER_RATIO * min(heights[i], height_sum / count)
+            if not same_line:
+                line += 1
+                count, center_sum, height_sum = 0, 0.0, 0.0
+            count += 1
+            center_sum += centers[i]
+            height_sum += heights[i]
+            line_of[i] = line
+
+        merged = []
+        for line_id in range(line + 1):
+            members = np.flatnonzero(line_of == line_id)
+            members = members[np.argsort(rects[members, 0], kind='stable')]
+            line_rects = rects[members]
+            line_height = np.median(heights[members])
+
+            # running right edge, so a long box is not "jumped over"
+            right = np.maximum.accumulate(line_rects[:, 2])
+            gaps = line_rects[1:, 0] - right[:-1]
+            breaks = np.concatenate([[True], gaps > OCRService.LINE_GAP_RATIO * line_height])
+
+            for group in np.split(line_rects, np.flatnonzero(breaks)[1:]):
+                merged.extend(OCRService._split_run(group, max_aspect))
+
+        return [
+            [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+            for x1, y1, x2, y2 in (
+                (int(r[0]), int(r[1]), int(r[2]), int(r[3])) for r in merged
+            )
+        ]
+
+    @staticmethod
+    def _split_run(group, max_aspect):
+        """Bounding rectangles of a run of boxes, split to respect max_aspect"""
+        runs = []
+        current = group[0].copy()
+
+        for rect in group[1:]:
+            candidate = np.concatenate([np.minimum(current[:2], rect[:2]), np.maximum(current[2:], rect[2:])])
+            width = candidate[2] - candidate[0]
+            height = max(candidate[3] - candidate[1], 1.0)
+            if max_aspect and width / height > max_aspect:
+                runs.append(current)
+                current = rect.copy()
+            else:
+                current = candidate
+
+        runs.append(current)
+        return runs
+
+    @staticmethod
+    def extract_text(image_bytes, preprocess=None, use_vietocr=None, profile=None):
+        """
+        Extract text from image (raw bytes or an ImageContext)
+        profile: name in OCR_PROFILES (default: the deployment's profile)
+        preprocess: True / 'auto' picks a plan per image, False / 'none'
+        skips it, or one of PREPROCESS_PLANS forces that plan
         - EasyOCR: detect bbox
         - VietOCR: recognize text (optional)
+
+        When VietOCR is the recognizer, EasyOCR only runs detection and the
+        confidence comes from VietOCR itself. Word boxes are merged into
+        line boxes first (VietOCR is trained on text lines), which also puts
+        the segments in reading order. readtext() (detection +
+        EasyOCR recognition) is kept as the fallback path.
         """
+        segments = []
+        for kind, payload in OCRService.extract_text_stream(image_bytes, preprocess, use_vietocr, profile):
+            if kind == 'segments':
+                segments.extend(segment for _, segment in payload)
+        return segments
+
+    @staticmethod
+    def extract_text_stream(image_bytes, preprocess=None, use_vietocr=None, profile=None,
+                            chunk_size=None):
+        """
+        extract_text as a generator of partial results:
+        - ('boxes', [bbox]): line boxes (original coordinates) once detected
+        - ('segments', [(box index, segment)]): recognized lines, chunk_size
+          lines at a time (None = all in one chunk, same batching as extract_text)
+        Lines that could not be recognized have no segment.
+        Through the model server, boxes and segments arrive together at the end.
+        """
+        settings = OCRService.resolve_settings(profile, preprocess, use_vietocr)
+
+        ctx = image_bytes if isinstance(image_bytes, ImageContext) \
+            else ImageContext.from_bytes(image_bytes)
+        ctx.profile = settings['name']
+
+        client = get_model_client()
+        if client is not None:
+            result = client.extract_text(
+                ctx.original, preprocess=preprocess, use_vietocr=use_vietocr, profile=profile
+            )
+            ctx.preprocess_plan = result['preprocess_plan']
+            yield 'boxes', [segment['bbox'] for segment in result['segments']]
+            yield 'segments', list(enumerate(result['segments']))
+            return
+
         reader = get_ocr_reader()
-        vietocr = get_vietocr_predictor()
+        vietocr = get_vietocr_batch_predictor()
 
         if reader is None:
             raise RuntimeError("OCR reader not initialized")
 
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        original_img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        if ctx.processed is None:
+            if settings['preprocess'] != 'none' or settings['max_pixels']:
+                OCRService.preprocess(ctx, settings['preprocess'], settings['max_pixels'])
+            else:
+                ctx.preprocess_plan = 'none'
+
+        detection_img = ctx.detection_image
+
+        if settings['recognizer'] == 'easyocr' or vietocr is None:
+            segments = OCRService._readtext_segments(reader, ctx, settings)
+            yield 'boxes', [segment['bbox'] for segment in segments]
+            yield 'segments', list(enumerate(segments))
+            return
+
+        det_boxes = []
+        boxes = []
+        crops = []
+
+        detected = OCRService.detect_boxes_tiled(
+            reader, detection_img,
+            tile_size=settings['tile_size'],
+            canvas_size=settings['canvas_size'],
+            mag_ratio=settings['mag_ratio']
+        )
+        detected = OCRService.merge_lines(
+            detected, max_aspect=vietocr.image_max_width / vietocr.image_height
+        )
+        for det_bbox in detected:
+            bbox = ctx.to_original(det_bbox)
+            crop = ctx.crop(bbox)
+            if crop is None:
+                continue
+
+            det_boxes.append(det_bbox)
+            boxes.append(bbox)
+            crops.append(crop)
+
+        yield 'boxes', boxes
+
+        step = chunk_size or max(len(boxes), 1)
+        for start in range(0, len(boxes), step):
+            chunk = slice(start, start + step)
+
+            if settings['recognizer'] == 'two_pass':
+                predictions = OCRService._recognize_two_pass(
+                    reader, vietocr, ctx, det_boxes[chunk], boxes[chunk], crops[chunk]
+                )
+            else:
+                predictions = [
+                    None if p is None else p + (1,)
+                    for p in OCRService._recognize_vietocr(
+                        reader, vietocr, detection_img, det_boxes[chunk], crops[chunk]
+                    )
+                ]
+
+            segments = []
+
+            for index, (bbox, prediction) in enumerate(zip(boxes[chunk], predictions), start=start):
+                if prediction is None:
+                    continue
+
+                text, confidence, engine, ocr_pass = prediction
+                segments.append((index, {
+                    "text": text,
+                    "confidence": OCRService._to_confidence(confidence),
+                    "bbox": bbox,
+                    "engine": engine,
+                    "pass": ocr_pass
+                }))
+
+            yield 'segments', segments
 
-        if preprocess:
-            processed_img = OCRService.preprocess_image(image_bytes)
+    @staticmethod
+    def recognize_region(region_image, boxes=None, profile=None):
+        """
+        Re-OCR one rectangle cut out of a page (BGR, region coordinates)
+        boxes: stored line boxes inside the region, recognized as they are;
+        when empty, text is detected inside the region first.
+        Only the region is converted / cropped / detected, so the cost
+        follows its size, not the page's. Returns segments in region coordinates.
+        """
+        settings = OCRService.resolve_settings(profile)
+
+        client = get_model_client()
+        if client is not None:
+            return client.recognize_region(region_image, boxes=boxes, profile=profile)
+
+        reader = get_ocr_reader()
+        vietocr = get_vietocr_batch_predictor()
+
+        if reader is None:
+            raise RuntimeError("OCR reader not initialized")
+
+        ctx = ImageContext(region_image)
+
+        if not boxes:
+            boxes = OCRService.detect_boxes(
+                reader, ctx.gray,
+                canvas_size=max(ctx.width, ctx.height),
+                mag_ratio=settings['mag_ratio']
+            )
+            if vietocr is not None:
+                boxes = OCRService.merge_lines(
+                    boxes, max_aspect=vietocr.image_max_width / vietocr.image_height
+                )
+
+        kept = []
+        crops = []
+        for bbox in boxes:
+            crop = ctx.crop(bbox)
+            if crop is not None:
+                kept.append(bbox)
+                crops.append(crop)
+
+        if not kept:
+            return []
+
+        if settings['recognizer'] == 'easyocr' or vietocr is None:
+            predictions = [
+                None if p is None else p + ('easyocr', 1)
+                for p in OCRService._recognize_easyocr(reader, ctx.gray, kept)
+            ]
+        elif settings['recognizer'] == 'two_pass':
+            predictions = OCRService._recognize_two_pass(reader, vietocr, ctx, kept, kept, crops)
         else:
-            processed_img = cv2.cvtColor(original_img, cv2.COLOR_BGR2GRAY)
+            predictions = [
+                None if p is None else p + (1,)
+                for p in OCRService._recognize_vietocr(reader, vietocr, ctx.gray, kept, crops)
+            ]
 
-        results = reader.readtext(processed_img)
+        return [
+            {
+                "text": prediction[0],
+                "confidence": OCRService._to_confidence(prediction[1]),
+                "bbox": bbox,
+                "engine": prediction[2],
+                "pass": prediction[3]
+            }
+            for bbox, prediction in zip(kept, predictions)
+            if prediction is not None
+        ]
 
-        segments = []
+    @staticmethod
+    def _recognize_vietocr(reader, vietocr, detection_img, det_boxes, crops):
+        """Batched VietOCR, per-crop fallback. Returns [(text, conf, engine)]"""
+        try:
+            return [(text, prob, 'vietocr') for text, prob in vietocr.predict_batch(crops)]
+        except Exception:
+            return [
+                OCRService._recognize_single(reader, vietocr, detection_img, det_bbox, crop)
+                for det_bbox, crop in zip(det_boxes, crops)
+            ]
+
+    @staticmethod
+    def _recognize_single(reader, vietocr, processed_img, bbox, crop):
+        """
+        Recognize one crop with VietOCR, falling back to EasyOCR
+        The crop goes through the batch predictor / scheduler as a batch of
+        one: the model is never called from request threads directly.
+        """
+        try:
+            text, prob = vietocr.predict_batch([crop])[0]
+            return text, prob, 'vietocr'
+        except Exception:
+            # fallback: EasyOCR recognizer on this box only
+            recognized = reader.recognize(
+                processed_img, horizontal_list=[], free_list=[bbox]
+            )
+            if not recognized:
+                return None
+            _, text, confidence = recognized[0]
+            return text, confidence, 'easyocr'
+
+    @staticmethod
+    def _recognize_easyocr(reader, detection_img, det_boxes):
+        """
+        EasyOCR recognizer on axis-aligned detection boxes, in one call
+        Returns [(text, conf)] in det_boxes order (None when not recognized)
+        """
+        rects = np.array(
+            [[min(p[0] for p in b), min(p[1] for p in b), max(p[0] for p in b), max(p[1] for p in b)]
+             for b in det_boxes],
+            dtype=np.float64
+        )
+        horizontal_list = [[int(x1), int(x2), int(y1), int(y2)] for x1, y1, x2, y2 in rects]
+        recognized = reader.recognize(detection_img, horizontal_list=horizontal_list, free_list=[])
+
+        # recognize() reorders its output: match results back by overlap
+        results = [None] * len(det_boxes)
+        areas = (rects[:, 2] - rects[:, 0]) * (rects[:, 3] - rects[:, 1])
+        for bbox, text, confidence in recognized:
+            xs = [p[0] for p in bbox]
+            ys = [p[1] for p in bbox]
+            ix = np.clip(np.minimum(rects[:, 2], max(xs)) - np.maximum(rects[:, 0], min(xs)), 0, None)
+            iy = np.clip(np.minimum(rects[:, 3], max(ys)) - np.maximum(rects[:, 1], min(ys)), 0, None)
+            overlap = ix * iy / np.maximum(areas, 1.0)
+            results[int(np.argmax(overlap))] = (text, confidence)
+
+        return results
+
+    @staticmethod
+    def pass1_accepts(text, confidence):
+        """Whether a first-pass EasyOCR line is good enough to keep"""
+        text = (text or '').strip()
+        if not text:
+            return False
+        if OCRService._NUMERIC_RE.match(text):
+            return confidence >= OCRService.PASS1_ACCEPT_NUMERIC
+        if text.isascii():
+            return confidence >= OCRService.PASS1_ACCEPT_ASCII
+        return confidence >= OCRService.PASS1_ACCEPT_ANY
+
+    @staticmethod
+    def _retry_crop(ctx, bbox):
+        """
+        Padded, contrast-stretched grayscale crop for a second recognition
+        attempt. VietOCR rescales every crop to its input height, so
+        upscaling would not change what it sees; faint or low-contrast
+        lines get the full gray range instead.
+        """
+        height = max(p[1] for p in bbox) - min(p[1] for p in bbox)
+        crop = ctx.crop(bbox, pad=int(round(height * OCRService.RETRY_PADDING)))
+        if crop is None:
+            return None
+
+        gray = cv2.cvtColor(crop, cv2.COLOR_RGB2GRAY)
+        low, high = np.percentile(gray, OCRService.RETRY_STRETCH)
+        if high - low >= 1:
+            gray = np.clip((gray - low) * (255.0 / (high - low)), 0, 255).astype(np.uint8)
+        return cv2.cvtColor(gray, cv2.COLOR_GRAY2RGB)
 
-        for bbox, easy_text, confidence in results:
-            x = [int(p[0]) for p in bbox]
-            y = [int(p[1]) for p in bbox]
+    @staticmethod
+    def _recognize_two_pass(reader, vietocr, ctx, det_boxes, boxes, crops):
+        """
+        Confidence-gated recognition, returns [(text, conf, engine, pass)]
+        - pass 1: EasyOCR recognizer on every line; numeric, plain ASCII or
+          very confident lines are accepted
+        - pass 2: VietOCR on the remaining lines (diacritics, low confidence)
+        - pass 3: lines VietOCR is still unsure about are re-cropped with
+          padding and contrast-stretched, the better of the two readings is kept
+        """
+        detection_img = ctx.detection_image
+        results = [None] * len(det_boxes)
+        hard = []
 
-            crop = original_img[min(y):max(y), min(x):max(x)]
-            if crop.size == 0:
+        for idx, first in enumerate(OCRService._recognize_easyocr(reader, detection_img, det_boxes)):
+            if first is not None and OCRService.pass1_accepts(first[0], OCRService._to_confidence(first[1])):
+                results[idx] = (first[0], first[1], 'easyocr', 1)
+            else:
+                hard.append(idx)
+
+        predictions = OCRService._recognize_vietocr(
+            reader, vietocr, detection_img,
+            [det_boxes[i] for i in hard], [crops[i] for i in hard]
+        )
+        retry = []
+        for idx, prediction in zip(hard, predictions):
+            if prediction is None:
                 continue
+            results[idx] = prediction + (2,)
+            if OCRService._to_confidence(prediction[1]) < OCRService.RETRY_CONFIDENCE:
+                retry.append(idx)
 
-            final_text = easy_text
+        retry_crops = [(idx, OCRService._retry_crop(ctx, boxes[idx])) for idx in retry]
+        retry_crops = [(idx, crop) for idx, crop in retry_crops if crop is not None]
+        if retry_crops:
+            try:
+                second = vietocr.predict_batch([crop for _, crop in retry_crops])
+            except Exception:
+                second = []
+            for (idx, _), (text, prob) in zip(retry_crops, second):
+                if OCRService._to_confidence(prob) > OCRService._to_confidence(results[idx][1]):
+                    results[idx] = (text, prob, 'vietocr', 3)
 
-            if use_vietocr and vietocr is not None:
-                pil_img = Image.fromarray(
-                    cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
-                )
-                try:
-                    final_text = vietocr.predict(pil_img)
-                except Exception:
-                    final_text = easy_text  # fallback
+        print(f"[OCR] Two-pass: {len(det_boxes) - len(hard)}/{len(det_boxes)} lines accepted "
+              f"in pass 1, {len(retry_crops)} retried")
+        return results
 
-            segments.append({
-                "text": final_text,
-                "confidence": float(confidence),
-                "bbox": [[int(c) for c in point] for point in bbox]
-            })
+    @staticmethod
+    def _readtext_segments(reader, ctx, settings):
+        """Detection + recognition by EasyOCR alone (fallback path)"""
+        results = reader.readtext(
+            ctx.detection_image,
+            canvas_size=settings['canvas_size'],
+            mag_ratio=settings['mag_ratio']
+        )
+        return [
+            {
+                "text": text,
+                "confidence": OCRService._to_confidence(confidence),
+                "bbox": ctx.to_original(bbox),
+                "engine": 'easyocr',
+                "pass": 1
+            }
+            for bbox, text, confidence in results
+        ]
 
-        return segments
+    @staticmethod
+    def _to_confidence(value):
+        """VietOCR returns NaN probability for empty predictions"""
+        value = float(value) if value is not None else 0.0
+        return value if value == value else 0.0
 
     @staticmethod
     def segments_to_text(segments):
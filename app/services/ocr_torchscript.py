@@ -0,0 +1,93 @@
+"""TorchScript artifacts of the OCR models (built by app/services/ocr_export.py)"""
+import json
+import os
+from importlib import metadata
+
+import torch
+
+
+ARTIFACTS = {
+    'craft': 'craft.pt',
+    'vietocr_cnn': 'vietocr_cnn.pt',
+    'vietocr_encoder': 'vietocr_encoder.pt',
+}
+MANIFEST = 'manifest.json'
+
+
+class VietOCREncoder(torch.nn.Module):
+    """forward() = LanguageTransformer.forward_encoder, so it can be traced"""
+
+    def __init__(self, transformer):
+        super().__init__()
+        self.transformer = transformer
+
+    def forward(self, src):
+        return self.transformer.forward_encoder(src)
+
+
+def set_encoder(transformer, encoder):
+    """
+    Route LanguageTransformer.forward_encoder to encoder (None restores it)
+    Stored in the instance __dict__: plain assignment of a Module would
+    register a submodule, and the class method would still win the lookup.
+    """
+    if encoder is None:
+        transformer.__dict__.pop('forward_encoder', None)
+    else:
+        object.__setattr__(transformer, 'forward_encoder', encoder)
+
+
+def runtime_versions(vietocr_config='vgg_transformer'):
+    """Versions the artifacts depend on; a mismatch makes them stale"""
+    return {
+        'torch': torch.__version__,
+        'easyocr': metadata.version('easyocr'),
+        'vietocr': metadata.version('vietocr'),
+        'vietocr_config': vietocr_config,
+    }
+
+
+def read_manifest(directory):
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(directory, manifest):
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def load_torchscript_models(reader, predictor, directory, device):
+    """
+    Swap the traced modules into a loaded EasyOCR Reader / VietOCR Predictor
+    - reader.detector: traced CRAFT
+    - predictor.model.cnn / transformer.forward_encoder: traced VietOCR encoder side
+    The VietOCR decoder stays eager (token-by-token loop in vietocr.translate).
+    Returns False, leaving the eager models untouched, when the artifacts are
+    missing or were built for other library versions.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return False
+
+    if manifest.get('versions') != runtime_versions():
+        print(f"[OCR] TorchScript artifacts in {directory} are stale, using eager models "
+              f"(rebuild: python -m app.services.ocr_export)")
+        return False
+
+    paths = {name: os.path.join(directory, filename) for name, filename in ARTIFACTS.items()}
+    missing = [path for path in paths.values() if not os.path.exists(path)]
+    if missing:
+        print(f"[OCR] TorchScript artifacts missing: {missing}, using eager models")
+        return False
+
+    reader.detector = torch.jit.load(paths['craft'], map_location=device).eval()
+    predictor.model.cnn = torch.jit.load(paths['vietocr_cnn'], map_location=device).eval()
+    set_encoder(predictor.model.transformer,
+                torch.jit.load(paths['vietocr_encoder'], map_location=device).eval())
+
+    print(f"[OCR] Loaded TorchScript models from {directory}")
+    return True
@@ -0,0 +1,77 @@
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+class SharedArray:
+    """
+    A NumPy array living in a multiprocessing.shared_memory segment
+
+    The owner creates it (`create`), sends `descriptor` (a small dict:
+    segment name, shape, dtype, byte offset) to another process and releases
+    it when the call is over. The other process maps the same memory with `attach`,
+    so the pixels never go through pickle or a socket.
+
+    Every view must be dropped before `release()`: a segment cannot be
+    closed while NumPy still exports its buffer.
+    """
+
+    def __init__(self, shm, shape, dtype, owner, offset=0):
+        self._shm = shm
+        self._owner = owner
+        self.offset = offset
+        self.array = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    @classmethod
+    def create(cls, array):
+        """Copy array into a new segment owned by this process"""
+        array = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        shared = cls(shm, array.shape, array.dtype, owner=True)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor):
+        """Map a segment created by another process"""
+        try:
+            shm = shared_memory.SharedMemory(name=descriptor['name'], track=False)  # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=descriptor['name'])
+            # older versions track attached segments too and would unlink
+            # them when this process exits: only the owner may do that
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(
+            shm, tuple(descriptor['shape']), np.dtype(descriptor['dtype']),
+            owner=False, offset=descriptor.get('offset', 0)
+        )
+
+    @property
+    def descriptor(self):
+        return {
+            'name': self._shm.name,
+            'shape': self.array.shape,
+            'dtype': self.array.dtype.str,
+            'offset': self.offset
+        }
+
+    def release(self):
+        """Unmap the segment; the owner also destroys it"""
+        if self._shm is None:
+            return
+
+        self.array = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # a view is still alive somewhere: the mapping goes with it
+            pass
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
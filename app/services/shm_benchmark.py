@@ -0,0 +1,80 @@
+"""
+Benchmark: handing a decoded image to another process, pickled vs shared memory
+
+    python -m app.services.shm_benchmark [--runs 20] [--workers 1]
+
+For 1MP / 4MP / 12MP BGR images, measures one round trip through a
+ProcessPoolExecutor: the worker touches every pixel and returns a checksum.
+- pickle: the array is the task argument (pickled, copied through a pipe)
+- shm: the array is copied once into a SharedArray, only its descriptor is
+  pickled, the worker maps the segment and the owner releases it afterwards
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.services.shared_array import SharedArray
+
+
+SIZES = {
+    '1MP': (1000, 1000),
+    '4MP': (1728, 2304),
+    '12MP': (3000, 4000),
+}
+
+
+def _checksum_array(image):
+    return int(image[::64, ::64].sum()), image.shape
+
+
+def _checksum_shared(descriptor):
+    shared = SharedArray.attach(descriptor)
+    try:
+        return int(shared.array[::64, ::64].sum()), shared.array.shape
+    finally:
+        shared.release()
+
+
+def _time_pickle(pool, image):
+    start = time.perf_counter()
+    pool.submit(_checksum_array, image).result()
+    return time.perf_counter() - start
+
+
+def _time_shared(pool, image):
+    start = time.perf_counter()
+    with SharedArray.create(image) as shared:
+        pool.submit(_checksum_shared, shared.descriptor).result()
+    return time.perf_counter() - start
+
+
+def run(runs=20, workers=1):
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pool.submit(_checksum_array, np.zeros((1, 1, 3), np.uint8)).result()  # warm up
+
+        for label, (h, w) in SIZES.items():
+            image = np.random.randint(0, 256, (h, w, 3), dtype=np.uint8)
+            with SharedArray.create(image) as shared:
+                assert pool.submit(_checksum_shared, shared.descriptor).result() == _checksum_array(image)
+
+            pickled = [_time_pickle(pool, image) for _ in range(runs)]
+            shared = [_time_shared(pool, image) for _ in range(runs)]
+            rows.append((label, image.nbytes, statistics.median(pickled), statistics.median(shared)))
+
+    print(f"{'size':>6} {'MB':>7} {'pickle ms':>10} {'shm ms':>8} {'speedup':>8}")
+    for label, nbytes, pickled, shared in rows:
+        print(f"{label:>6} {nbytes / 1e6:7.1f} {pickled * 1000:10.2f} "
+              f"{shared * 1000:8.2f} {pickled / shared:7.1f}x")
+    return rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+    run(args.runs, args.workers)
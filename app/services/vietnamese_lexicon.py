@@ -0,0 +1,146 @@
+"""
+Vietnamese syllable lexicon for a fast "is this text already clean" check
+
+The set of well-formed syllables is compiled from the orthography
+(initial consonant + rhyme, with the c/k, g/gh, ng/ngh and qu spelling
+rules) without tone marks; the tone is checked separately (at most one,
+and only sắc / nặng on rhymes ending in p, t, c, ch). Tones can go on
+either vowel (hòa / hoà), both spellings are accepted.
+
+OCR errors such as a lost or wrong diacritic (viet, nguòi), split or
+merged syllables and stray characters mostly give syllables outside this
+set; a wrong tone that still spells a real syllable (dấu / dâu) is not
+caught.
+"""
+import re
+import unicodedata
+
+
+INITIALS = (
+    '', 'b', 'c', 'ch', 'd', 'đ', 'g', 'gh', 'gi', 'h', 'k', 'kh', 'l', 'm', 'n',
+    'ng', 'ngh', 'nh', 'p', 'ph', 'qu', 'r', 's', 't', 'th', 'tr', 'v', 'x'
+)
+
+# nucleus -> finals it takes ('' = open syllable)
+NUCLEUS_FINALS = {
+    'a': ('', 'i', 'o', 'u', 'y', 'm', 'n', 'ng', 'nh', 'p', 't', 'c', 'ch'),
+    'ă': ('m', 'n', 'ng', 'p', 't', 'c'),
+    'â': ('u', 'y', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'e': ('', 'o', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'ê': ('', 'u', 'm', 'n', 'nh', 'p', 't', 'ch'),
+    'i': ('', 'u', 'm', 'n', 'nh', 'p', 't', 'ch'),
+    'y': ('',),
+    'o': ('', 'i', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'oo': ('ng', 'c'),
+    'ô': ('', 'i', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'ơ': ('', 'i', 'm', 'n', 'p', 't'),
+    'u': ('', 'i', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'ư': ('', 'i', 'u', 'm', 'n', 'ng', 't', 'c'),
+    'ia': ('',),
+    'iê': ('u', 'm', 'n', 'ng', 'p', 't', 'c'),
+    'yê': ('u', 'm', 'n', 'ng', 't'),
+    'ua': ('',),
+    'uô': ('i', 'm', 'n', 'ng', 't', 'c'),
+    'ưa': ('',),
+    'ươ': ('i', 'u', 'm', 'n', 'ng', 'p', 't', 'c'),
+}
+
+# rhymes with the o / u glide (hoa, khoăn, thuế, quy, chuyện)
+GLIDE_RHYMES = (
+    'oa', 'oai', 'oay', 'oao', 'oam', 'oan', 'oang', 'oanh', 'oap', 'oat', 'oac', 'oach',
+    'oăm', 'oăn', 'oăng', 'oăt', 'oăc', 'oe', 'oeo', 'oen', 'oet',
+    'uê', 'uênh', 'uêch', 'uy', 'uyu', 'uya', 'uyn', 'uynh', 'uyt', 'uych', 'uyên', 'uyêt',
+    'uân', 'uâng', 'uât', 'uây', 'uơ'
+)
+
+STOP_FINALS = ('p', 't', 'c', 'ch')
+
+# combining marks of the five tones (NFD)
+TONE_MARKS = {
+    '\u0300': 'huyền', '\u0301': 'sắc', '\u0303': 'ngã', '\u0309': 'hỏi', '\u0323': 'nặng'
+}
+STOP_TONES = ('sắc', 'nặng')
+
+FRONT_VOWELS = ('i', 'y', 'e', 'ê')
+WORD_RE = re.compile(r"\w+")
+
+
+def _spelling_ok(initial: str, rhyme: str) -> bool:
+    front = rhyme.startswith(FRONT_VOWELS)
+    if initial in ('k', 'gh', 'ngh'):
+        return front
+    if initial in ('c', 'g', 'ng'):
+        # gi... is spelled with g (gì, gìn); c + glide u is qu
+        return (not front or (initial == 'g' and rhyme.startswith('i'))) and \
+            not (initial == 'c' and rhyme.startswith('u') and rhyme in GLIDE_RHYMES)
+    if initial == 'qu':
+        return not rhyme.startswith(('u', 'o', 'ư'))
+    return True
+
+
+def compile_syllables() -> frozenset:
+    """Every well-formed syllable, lowercase NFC, without tone marks"""
+    rhymes = set(GLIDE_RHYMES)
+    for nucleus, finals in NUCLEUS_FINALS.items():
+        rhymes.update(nucleus + final for final in finals)
+
+    syllables = set()
+    for initial in INITIALS:
+        for rhyme in rhymes:
+            if initial == 'gi' and rhyme.startswith('i'):
+                rhyme = rhyme[1:]  # gi + iêt = giết
+                if not rhyme:
+                    continue
+            if _spelling_ok(initial, rhyme):
+                syllables.add(initial + rhyme)
+    # q + glide rhyme: the u of qu is the glide (quỳnh, quýt, quých, quyết)
+    syllables.update('q' + rhyme for rhyme in GLIDE_RHYMES if rhyme.startswith('u'))
+    return frozenset(syllables)
+
+
+SYLLABLES = compile_syllables()
+
+
+def split_tone(word: str):
+    """(lowercase NFC syllable without tone marks, [tones])"""
+    decomposed = unicodedata.normalize('NFD', word.lower())
+    tones = [TONE_MARKS[ch] for ch in decomposed if ch in TONE_MARKS]
+    base = ''.join(ch for ch in decomposed if ch not in TONE_MARKS)
+    return unicodedata.normalize('NFC', base), tones
+
+
+def is_syllable(word: str) -> bool:
+    """word is a well-formed Vietnamese syllable (tone included)"""
+    base, tones = split_tone(word)
+    if base not in SYLLABLES or len(tones) > 1:
+        return False
+    return not base.endswith(STOP_FINALS) or (bool(tones) and tones[0] in STOP_TONES)
+
+
+def _is_abbreviation(word: str) -> bool:
+    return 1 < len(word) <= 6 and word.isupper() and word.replace('Đ', 'D').isascii()
+
+
+def oov_counts(text: str):
+    """
+    (out-of-lexicon words, checked words) of a text
+    Words with digits and short all-caps abbreviations (UBND, QĐ) are not
+    checked; foreign words count as out of lexicon.
+    """
+    oov = 0
+    checked = 0
+    for word in WORD_RE.findall(text):
+        if any(ch.isdigit() for ch in word) or '_' in word:
+            continue
+        known = is_syllable(word)
+        if not known and _is_abbreviation(word):
+            continue
+        checked += 1
+        oov += not known
+    return oov, checked
+
+
+def oov_rate(text: str) -> float:
+    """Share of checked words outside the lexicon, 0.0 when none is checked"""
+    oov, checked = oov_counts(text)
+    return oov / checked if checked else 0.0
@@ -0,0 +1,133 @@
+import hashlib
+import math
+from collections import defaultdict
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+from vietocr.tool.translate import translate, resize
+
+
+class BatchPredictor:
+    """
+    Batched recognition on top of a VietOCR Predictor
+
+    Crops are resized to the model input height, grouped into width
+    buckets, right-padded with white to the bucket width and decoded
+    together in one greedy transformer pass per batch.
+
+    With a cache (DiskLRUCache) set, every resized crop is looked up by
+    the hash of its pixels first and only the misses reach the model:
+    letterheads, headers and footers repeated across pages are read once.
+    cache_version must change whenever the model output can change.
+    """
+
+    def __init__(self, predictor, max_batch_size=32, bucket_width=32,
+                 cache=None, cache_version=''):
+        self.predictor = predictor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.bucket_width = max(1, int(bucket_width))
+        self.cache = cache
+        self.cache_version = cache_version
+
+        dataset_cfg = predictor.config['dataset']
+        self.image_height = dataset_cfg['image_height']
+        self.image_min_width = dataset_cfg['image_min_width']
+        self.image_max_width = dataset_cfg['image_max_width']
+        self.device = predictor.config['device']
+
+    def _bucket_of(self, width):
+        return math.ceil(width / self.bucket_width) * self.bucket_width
+
+    def _resize(self, img):
+        """
+        Resize an RGB crop (ndarray view or PIL image) to the model height
+        Returns a uint8 HxWx3 array; the only copy made per crop
+        VietOCR was trained on PIL LANCZOS resizes, which antialias when
+        shrinking: INTER_AREA matches them on downscale (cv2 LANCZOS4 does
+        not antialias), LANCZOS4 is kept for upscaling.
+        """
+        if isinstance(img, Image.Image):
+            img = np.asarray(img.convert('RGB'))
+
+        h, w = img.shape[:2]
+        new_w, new_h = resize(w, h, self.image_height, self.image_min_width, self.image_max_width)
+        interpolation = cv2.INTER_AREA if new_h < h else cv2.INTER_LANCZOS4
+        return cv2.resize(img, (new_w, new_h), interpolation=interpolation)
+
+    def _cache_key(self, arr):
+        """
+        Hash of the resized crop, on 16 gray levels so re-encoded copies
+        of the same region (JPEG noise) still match
+        """
+        gray = cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY) >> 4
+        digest = hashlib.blake2b(gray.tobytes(), digest_size=16)
+        digest.update(str(gray.shape).encode())
+        return f"{self.cache_version}:{digest.hexdigest()}"
+
+    def predict_batch(self, images):
+        """
+        Recognize a list of RGB crops (ndarray or PIL images)
+        Returns [(text, prob)] in the same order as images
+        """
+        if not images:
+            return []
+
+        arrays = [self._resize(img) for img in images]
+        results = [None] * len(images)
+
+        keys = None
+        if self.cache is not None:
+            keys = [self._cache_key(arr) for arr in arrays]
+            for idx, key in enumerate(keys):
+                cached = self.cache.get(key)
+                if cached is not None:
+                    results[idx] = tuple(cached)
+
+        pending = [idx for idx, result in enumerate(results) if result is None]
+
+        # beam search has no batched implementation in vietocr
+        if self.predictor.config['predictor']['beamsearch']:
+            for idx in pending:
+                img = images[idx]
+                results[idx] = self.predictor.predict(
+                    img if isinstance(img, Image.Image) else Image.fromarray(img),
+                    return_prob=True
+                )
+        else:
+            self._predict_arrays(arrays, pending, results)
+
+        if self.cache is not None:
+            # one transaction per batch, not one commit per crop
+            self.cache.set_many([
+                (keys[idx], [results[idx][0], float(results[idx][1])]) for idx in pending
+            ])
+
+        return results
+
+    def _predict_arrays(self, arrays, indices, results):
+        """Batched greedy decoding of arrays[indices], written into results"""
+        buckets = defaultdict(list)
+        for idx in indices:
+            buckets[self._bucket_of(arrays[idx].shape[1])].append(idx)
+
+        for bucket_width in sorted(buckets):
+            bucket = buckets[bucket_width]
+
+            for start in range(0, len(bucket), self.max_batch_size):
+                chunk = bucket[start:start + self.max_batch_size]
+
+                batch = np.ones(
+                    (len(chunk), 3, self.image_height, bucket_width), dtype=np.float32
+                )
+                for row, idx in enumerate(chunk):
+                    arr = arrays[idx]
+                    batch[row, :, :, :arr.shape[1]] = arr.transpose(2, 0, 1) / 255.0
+
+                tensor = torch.from_numpy(batch).to(self.device)
+                sents, probs = translate(tensor, self.predictor.model)
+
+                for row, idx in enumerate(chunk):
+                    text = self.predictor.vocab.decode(sents[row].tolist())
+                    results[idx] = (text, probs[row])
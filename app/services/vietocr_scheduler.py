@@ -0,0 +1,157 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatchScheduler:
+    """
+    Cross-request micro-batching in front of a BatchPredictor
+
+    Every caller's crops go into one queue. A single inference thread takes
+    the first waiting crop, keeps collecting for window_ms (or until
+    max_batch_size crops are waiting), runs one predict_batch() over all of
+    them and resolves each crop's Future. Concurrent requests therefore
+    share forward passes, and the model is only ever called from one thread.
+    When a merged batch fails, every caller's crops are run again on their
+    own, so only the caller whose input fails gets the exception.
+
+    Exposes the same interface as BatchPredictor (predict_batch, predictor,
+    image_height, image_max_width), so callers do not need to know.
+    """
+
+    def __init__(self, batch_predictor, max_batch_size=64, window_ms=5):
+        self.batch_predictor = batch_predictor
+        self.predictor = batch_predictor.predictor
+        self.image_height = batch_predictor.image_height
+        self.image_max_width = batch_predictor.image_max_width
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, window_ms / 1000.0)
+
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._thread = None
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._crops = 0
+        self._wait_total = 0.0
+        self._histogram = {}
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name='vietocr-scheduler', daemon=True
+                )
+                self._thread.start()
+
+    def predict_batch(self, images):
+        """
+        Recognize a list of RGB crops together with other in-flight requests
+        Returns [(text, prob)] in the same order as images
+        """
+        if not images:
+            return []
+
+        self._ensure_started()
+
+        futures = []
+        now = time.monotonic()
+        caller = object()
+        for img in images:
+            future = Future()
+            self._queue.put((img, future, now, caller))
+            futures.append(future)
+
+        return [future.result() for future in futures]
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        batch.append(self._queue.get(timeout=remaining))
+                    else:
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            self._run(batch)
+
+    def _run(self, batch):
+        started = time.monotonic()
+        self._record(len(batch), sum(started - queued for _, _, queued, _ in batch))
+
+        try:
+            results = self.batch_predictor.predict_batch([img for img, _, _, _ in batch])
+        except Exception as e:
+            callers = {}
+            for entry in batch:
+                callers.setdefault(entry[3], []).append(entry)
+            if len(callers) == 1:
+                self._fail(batch, e)
+                return
+            # don't let one request's bad crop fail the others
+            for entries in callers.values():
+                self._run_alone(entries)
+            return
+
+        self._resolve(batch, results)
+
+    def _run_alone(self, entries):
+        try:
+            results = self.batch_predictor.predict_batch([img for img, _, _, _ in entries])
+        except Exception as e:
+            self._fail(entries, e)
+            return
+        self._resolve(entries, results)
+
+    @staticmethod
+    def _resolve(entries, results):
+        for (_, future, _, _), result in zip(entries, results):
+            future.set_result(result)
+
+    @staticmethod
+    def _fail(entries, error):
+        for _, future, _, _ in entries:
+            future.set_exception(error)
+
+    @staticmethod
+    def _bucket_of(size):
+        """Histogram bucket: the smallest power of two >= size"""
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        return bucket
+
+    def _record(self, size, wait):
+        bucket = self._bucket_of(size)
+        with self._stats_lock:
+            self._batches += 1
+            self._crops += size
+            self._wait_total += wait
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+    def stats(self):
+        """Queue depth and batch-size histogram (keys: batch size <= key)"""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'window_ms': round(self.window * 1000, 3),
+                'batches': self._batches,
+                'crops': self._crops,
+                'avg_batch_size': round(self._crops / self._batches, 2) if self._batches else 0.0,
+                'avg_wait_ms': round(self._wait_total / self._crops * 1000, 2) if self._crops else 0.0,
+                'batch_size_histogram': {
+                    str(bucket): count for bucket, count in sorted(self._histogram.items())
+                }
+            }
@@ -72,6 +72,7 @@ schema_statements = [
         height INT UNSIGNED NULL,
         source VARCHAR(50) DEFAULT 'upload',
         checksum VARCHAR(64) NULL,
+        phash CHAR(64) NULL,
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
         INDEX idx_user_id (user_id),
         INDEX idx_checksum (checksum),
@@ -86,6 +87,9 @@ schema_statements = [
         user_id INT NOT NULL,
         engine VARCHAR(30) DEFAULT 'easyocr',
         language VARCHAR(20) DEFAULT 'vi,en',
+        pipeline_fingerprint VARCHAR(64) NULL,
+        preprocess_plan VARCHAR(20) NULL,
+        profile VARCHAR(20) NULL,
         raw_text LONGTEXT NULL,
         processed_text LONGTEXT NULL,
         corrected_text LONGTEXT NULL,
@@ -100,6 +104,7 @@ schema_statements = [
         INDEX idx_user_id (user_id),
         INDEX idx_status (status),
         INDEX idx_created_at (created_at),
+        INDEX idx_pipeline_fingerprint (pipeline_fingerprint),
         CONSTRAINT fk_ocr_results_image FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
         CONSTRAINT fk_ocr_results_user FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
     ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci""",
@@ -114,6 +119,8 @@ schema_statements = [
         bbox_y1 INT NULL,
         bbox_x2 INT NULL,
         bbox_y2 INT NULL,
+        engine VARCHAR(20) NULL,
+        ocr_pass TINYINT NULL,
         position INT DEFAULT 0,
         created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
         INDEX idx_ocr_result_id (ocr_result_id),
@@ -0,0 +1,14 @@
+-- ============================================================
+-- MIGRATION 002: OCR result reuse
+-- Date: 2026-10-17
+-- Description: Lưu fingerprint (version + tham số) của pipeline OCR
+--              để tái sử dụng kết quả khi upload lại cùng một ảnh
+-- ============================================================
+
+USE doan_ocr;
+
+ALTER TABLE ocr_results
+    ADD COLUMN pipeline_fingerprint VARCHAR(64) NULL
+        COMMENT 'Hash version + tham số pipeline (tái sử dụng kết quả)'
+        AFTER language,
+    ADD INDEX idx_pipeline_fingerprint (pipeline_fingerprint);
@@ -0,0 +1,13 @@
+-- ============================================================
+-- MIGRATION 003: OCR preprocess plan
+-- Date: 2026-10-17
+-- Description: Ghi lại kế hoạch tiền xử lý (none, clahe, fast, nlm)
+--              được chọn tự động cho từng ảnh
+-- ============================================================
+
+USE doan_ocr;
+
+ALTER TABLE ocr_results
+    ADD COLUMN preprocess_plan VARCHAR(20) NULL
+        COMMENT 'Tiền xử lý đã dùng: none, clahe, fast, nlm'
+        AFTER pipeline_fingerprint;
@@ -0,0 +1,13 @@
+-- ============================================================
+-- MIGRATION 004: OCR profile
+-- Date: 2026-10-17
+-- Description: Ghi lại profile tốc độ/chất lượng (fast, balanced,
+--              accurate) đã tạo ra mỗi kết quả OCR
+-- ============================================================
+
+USE doan_ocr;
+
+ALTER TABLE ocr_results
+    ADD COLUMN profile VARCHAR(20) NULL
+        COMMENT 'Profile OCR: fast, balanced, accurate'
+        AFTER preprocess_plan;
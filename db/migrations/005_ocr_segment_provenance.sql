@@ -0,0 +1,16 @@
+-- ============================================================
+-- MIGRATION 005: OCR segment provenance
+-- Date: 2026-10-17
+-- Description: Ghi lại recognizer (easyocr, vietocr) và lượt nhận
+--              dạng (1, 2, 3) của từng segment, để chỉnh ngưỡng two-pass
+-- ============================================================
+
+USE doan_ocr;
+
+ALTER TABLE ocr_segments
+    ADD COLUMN engine VARCHAR(20) NULL
+        COMMENT 'Recognizer: easyocr, vietocr'
+        AFTER bbox_y2,
+    ADD COLUMN ocr_pass TINYINT NULL
+        COMMENT 'Lượt nhận dạng: 1, 2, 3 (two-pass)'
+        AFTER engine;
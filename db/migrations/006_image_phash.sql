@@ -0,0 +1,13 @@
+-- ============================================================
+-- MIGRATION 006: Image perceptual hash
+-- Date: 2026-10-17
+-- Description: dHash 256-bit (hex) của ảnh upload, để nhận ra ảnh
+--              gần trùng (scan lại, nén lại) và dùng lại kết quả OCR
+-- ============================================================
+
+USE doan_ocr;
+
+ALTER TABLE images
+    ADD COLUMN phash CHAR(64) NULL
+        COMMENT 'dHash 256-bit (hex) để detect ảnh gần trùng'
+        AFTER checksum;
@@ -60,6 +60,7 @@ CREATE TABLE images (
     height INT UNSIGNED NULL COMMENT 'Chiều cao ảnh (px)',
     source VARCHAR(50) DEFAULT 'upload' COMMENT 'upload, url, camera',
     checksum VARCHAR(64) NULL COMMENT 'SHA256 hash để detect duplicate',
+    phash CHAR(64) NULL COMMENT 'dHash 256-bit (hex) để detect ảnh gần trùng',
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     
     INDEX idx_user_id (user_id),
@@ -82,6 +83,9 @@ CREATE TABLE ocr_results (
     -- OCR Engine info
     engine VARCHAR(30) DEFAULT 'easyocr' COMMENT 'easyocr, tesseract, google_vision',
     language VARCHAR(20) DEFAULT 'vi,en' COMMENT 'Ngôn ngữ OCR',
+    pipeline_fingerprint VARCHAR(64) NULL COMMENT 'Hash version + tham số pipeline (tái sử dụng kết quả)',
+    preprocess_plan VARCHAR(20) NULL COMMENT 'Tiền xử lý đã dùng: none, clahe, fast, nlm',
+    profile VARCHAR(20) NULL COMMENT 'Profile OCR: fast, balanced, accurate',
     
     -- Text outputs
     raw_text LONGTEXT NULL COMMENT 'Text thô từ OCR',
@@ -103,6 +107,7 @@ CREATE TABLE ocr_results (
     INDEX idx_user_id (user_id),
     INDEX idx_status (status),
     INDEX idx_created_at (created_at),
+    INDEX idx_pipeline_fingerprint (pipeline_fingerprint),
     
     CONSTRAINT fk_ocr_results_image 
         FOREIGN KEY (image_id) REFERENCES images(id) ON DELETE CASCADE,
@@ -127,6 +132,9 @@ CREATE TABLE ocr_segments (
     bbox_x2 INT NULL,
     bbox_y2 INT NULL,
     
+    engine VARCHAR(20) NULL COMMENT 'Recognizer: easyocr, vietocr',
+    ocr_pass TINYINT NULL COMMENT 'Lượt nhận dạng: 1, 2, 3 (two-pass)',
+    
     position INT DEFAULT 0 COMMENT 'Thứ tự segment trong ảnh',
     
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
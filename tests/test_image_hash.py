@@ -0,0 +1,52 @@
+"""Tests for the perceptual hash used by the near-duplicate lookup"""
+import cv2
+import numpy as np
+
+from app.services.image_hash import hamming, phash_bytes
+
+
+MAX_DISTANCE = 12  # default OCR_NEAR_DUPLICATE_MAX_DISTANCE
+
+
+def _encode(img, quality=95):
+    return cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def _page(lines, seed):
+    img = np.full((1400, 1000, 3), 255, np.uint8)
+    rng = np.random.default_rng(seed)
+    for k in range(lines):
+        words = ' '.join(''.join(rng.choice(list('abcdeghiklmnopqrstuvxy'), rng.integers(2, 8)))
+                         for _ in range(6))
+        cv2.putText(img, words, (40, 60 + k * 44), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    return img
+
+
+def _hash(image_bytes):
+    return int(phash_bytes(image_bytes), 16)
+
+
+def test_distinct_sparse_images_do_not_match():
+    first = _encode(_page(1, seed=4))
+    second = _encode(_page(1, seed=5))
+
+    # too little content to tell them apart: no hash, never matched
+    assert phash_bytes(first) is None
+    assert phash_bytes(second) is None
+
+
+def test_blank_page_has_no_hash():
+    assert phash_bytes(_encode(np.full((1400, 1000, 3), 255, np.uint8))) is None
+
+
+def test_reencoded_page_matches():
+    page = _page(30, seed=0)
+    assert hamming(_hash(_encode(page)), _hash(_encode(page, quality=30))) <= MAX_DISTANCE
+
+
+def test_different_pages_do_not_match():
+    assert hamming(_hash(_encode(_page(30, seed=0))), _hash(_encode(_page(30, seed=1)))) > MAX_DISTANCE
+
+
+def test_undecodable_bytes_have_no_hash():
+    assert phash_bytes(b'not an image') is None
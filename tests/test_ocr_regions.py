@@ -0,0 +1,63 @@
+"""Validation tests for POST /api/ocr/images/<id>/regions"""
+import json
+
+import pytest
+from flask import Flask
+
+from app import db, login_manager
+from app.models import Image, User
+from app.routes.ocr import ocr_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SECRET_KEY='test',
+        SQLALCHEMY_DATABASE_URI='sqlite://'
+    )
+    db.init_app(app)
+    login_manager.init_app(app)
+    login_manager.request_loader(lambda request: User.query.first())
+    app.register_blueprint(ocr_bp, url_prefix='/api/ocr')
+
+    with app.app_context():
+        db.create_all()
+        user = User(email='user@example.com', password_hash='x', full_name='User')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Image(id=1, user_id=user.id, file_name='page.png', file_path='page.png'))
+        db.session.commit()
+
+        yield app.test_client()
+
+        db.session.remove()
+        db.drop_all()
+
+
+def _post_regions(client, body):
+    # json.dumps writes NaN / Infinity, as a non-strict client would
+    return client.post('/api/ocr/images/1/regions', data=json.dumps(body), content_type='application/json')
+
+
+@pytest.mark.parametrize('region', [
+    [0, 0, float('nan'), 10],
+    [0, 0, float('inf'), 10],
+    [float('-inf'), 0, 10, 10],
+    [0, 0, 'inf', 10],
+])
+def test_non_finite_coordinates_rejected(client, region):
+    response = _post_regions(client, {'regions': [region]})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Region coordinates must be finite numbers'
+
+
+def test_inverted_region_rejected(client):
+    response = _post_regions(client, {'regions': [[10, 0, 0, 10]]})
+    assert response.status_code == 400
+
+
+def test_empty_regions_rejected(client):
+    response = _post_regions(client, {'regions': []})
+    assert response.status_code == 400
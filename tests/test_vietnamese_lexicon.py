@@ -0,0 +1,26 @@
+"""Tests for the Vietnamese syllable lexicon of the BART pre-filter"""
+import pytest
+
+from app.services.vietnamese_lexicon import is_syllable, oov_rate
+
+
+@pytest.mark.parametrize('word', [
+    'Quỳnh', 'quỳnh', 'quynh', 'quýnh', 'quýt', 'quỵt', 'quých', 'quyết', 'quyên', 'quân', 'quê', 'quy'
+])
+def test_qu_glide_syllables(word):
+    assert is_syllable(word)
+
+
+@pytest.mark.parametrize('word', ['quyt', 'quỳt', 'quych', 'quuynh'])
+def test_malformed_qu_syllables(word):
+    # stop finals take sắc / nặng only; a doubled glide is never spelled
+    assert not is_syllable(word)
+
+
+def test_names_with_qu_are_not_oov():
+    assert oov_rate('Nguyễn Thị Quỳnh mua quýt') == 0.0
+
+
+@pytest.mark.parametrize('word', ['viet', 'nguòi', 'xyz'])
+def test_ocr_errors_are_oov(word):
+    assert not is_syllable(word)